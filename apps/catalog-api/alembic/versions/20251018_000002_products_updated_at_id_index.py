@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20251018_000002"
+down_revision = "20250831_000001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Backs keyset pagination on (updated_at, id) for listing and the change feed
+    op.create_index("ix_products_updated_at_id", "products", ["updated_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_updated_at_id", table_name="products")
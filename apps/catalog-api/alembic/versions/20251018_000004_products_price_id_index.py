@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20251018_000004"
+down_revision = "20251018_000003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Backs the price-range listing (GET /products?min_price=&max_price=)
+    op.create_index("ix_products_price_id", "products", ["price", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_price_id", table_name="products")
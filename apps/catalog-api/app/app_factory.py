@@ -1,15 +1,36 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, Response, HTTPException
+from fastapi import FastAPI, Response, HTTPException, Query
 from contextlib import asynccontextmanager
 
 from .config import get_settings
 from . import db
 from .models import Base
-from .cache import init_redis, ping as redis_ping
-from .routes import router
+from .cache import (
+    hot_keys,
+    init_codec,
+    init_hot_keys,
+    init_local_cache,
+    init_redis,
+    init_tags,
+    ping as redis_ping,
+    start_invalidation_listener,
+    stop_invalidation_listener,
+)
+from .routes import (
+    hot_product_ids,
+    iter_all_products,
+    router,
+    suggest_candidates,
+    warm_products,
+)
 from .errors import http_exception_handler
-from .search import ping as os_ping
+from .events_adapter import init_event_encoding
+from events import publish_records_async, start_pipeline, stop_pipeline
+from .search import close_search_client, init_search_client, ping as os_ping
+from . import outbox, warmup
+from .suggest import start_trie_refresh, stop_trie_refresh
+from .local_search import init_local_search, start_seeding, stop_seeding
 from opentelemetry import trace
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
@@ -44,7 +65,52 @@ def create_app() -> FastAPI:
                 )
             except Exception:
                 pass
+        init_search_client(
+            settings.opensearch_url,
+            timeout_seconds=settings.opensearch_timeout_seconds,
+            max_retries=settings.opensearch_max_retries,
+            pool_maxsize=settings.opensearch_pool_maxsize,
+        )
+        start_invalidation_listener()
+        await start_pipeline(
+            queue_max_size=settings.events_queue_max_size,
+            overflow=settings.events_queue_overflow,
+            max_batch=settings.events_max_batch,
+            linger_ms=settings.kafka_linger_ms,
+            max_batch_bytes=settings.kafka_max_batch_bytes,
+            compression=settings.kafka_compression,
+        )
+        outbox.start_relay(
+            publish_records_async,
+            batch_size=settings.outbox_batch_size,
+            poll_interval_seconds=settings.outbox_poll_interval_seconds,
+        )
+        if db.is_ready():
+            start_seeding(iter_all_products)
+        # Preload hot products so a fresh pod or cache does not send its first
+        # minutes of traffic to the DB; /readyz holds traffic until it ends
+        if (settings.redis_url or settings.l1_cache_max_entries > 0) and (
+            settings.warmup_top_n > 0 or settings.warmup_seed_ids
+        ):
+            warmup.start_warmup(
+                hot_product_ids,
+                warm_products,
+                batch_size=settings.warmup_batch_size,
+                concurrency=settings.warmup_concurrency,
+                deadline_seconds=settings.warmup_deadline_seconds,
+            )
+        if settings.suggest_trie_size > 0:
+            start_trie_refresh(
+                suggest_candidates, settings.suggest_trie_refresh_seconds
+            )
         yield
+        await stop_trie_refresh()
+        await stop_seeding()
+        await warmup.stop_warmup()
+        await stop_invalidation_listener()
+        await outbox.stop_relay()
+        await stop_pipeline(settings.events_flush_timeout_seconds)
+        await close_search_client()
 
     app = FastAPI(title="Catalog API", version="1.0.0", lifespan=lifespan)
     app.add_exception_handler(HTTPException, http_exception_handler)
@@ -52,12 +118,43 @@ def create_app() -> FastAPI:
     # DB init (best-effort). If fails, app continues with in-memory repo.
     if settings.db_url:
         try:
-            db.init_engine(settings.db_url)
+            db.init_engine(
+                settings.db_url,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_timeout_seconds=settings.db_pool_timeout_seconds,
+                pool_recycle_seconds=settings.db_pool_recycle_seconds,
+                pool_pre_ping=settings.db_pool_pre_ping,
+                connect_timeout_seconds=settings.db_connect_timeout_seconds,
+                statement_timeout_ms=settings.db_statement_timeout_ms,
+                prepared_statement_cache_size=settings.db_prepared_statement_cache_size,
+            )
+            db.init_replicas(
+                settings.db_replica_urls,
+                selection=settings.db_replica_selection,
+                eject_after_failures=settings.db_replica_eject_after_failures,
+                eject_seconds=settings.db_replica_eject_seconds,
+                max_latency_ms=settings.db_replica_max_latency_ms,
+            )
         except Exception:
             pass
 
     # Redis cache init (best-effort)
     init_redis(settings.redis_url)
+    init_codec(settings.cache_codec, settings.cache_compress_min_bytes)
+    init_hot_keys(settings.hot_keys_top_k, settings.hot_keys_half_life_seconds)
+    outbox.init_outbox(settings.outbox_enabled)
+    init_event_encoding(
+        settings.event_encoding,
+        validate_avro=settings.validate_avro,
+        schema_dir=settings.avro_schema_dir,
+    )
+    init_tags(settings.search_tag_max_keys)
+    init_local_cache(settings.l1_cache_max_entries, settings.l1_cache_ttl_seconds)
+    init_local_search(
+        settings.local_search == "on"
+        or (settings.local_search == "auto" and not db.is_ready())
+    )
 
     # Health
     @app.get("/healthz")
@@ -78,15 +175,24 @@ def create_app() -> FastAPI:
         payload = generate_latest()
         return Response(content=payload, media_type=CONTENT_TYPE_LATEST)
 
+    @app.get("/debug/hot-keys")
+    def debug_hot_keys(limit: int = Query(20, ge=1, le=1000)):
+        return hot_keys(limit)
+
     @app.get("/readyz")
-    async def readyz():
+    async def readyz(response: Response):
         db_ok = await db.healthcheck() if settings.db_url else True
         redis_ok = await redis_ping()
-        os_ok = os_ping()
+        os_ok = await os_ping()
         ok = db_ok and os_ok  # redis optional
+        status = "ok" if ok else "degraded"
+        if warmup.in_progress():
+            response.status_code = 503
+            status = "warming"
         return {
-            "status": "ok" if ok else "degraded",
+            "status": status,
             "checks": {"db": db_ok, "redis": redis_ok, "opensearch": os_ok},
+            "warmup": warmup.progress(),
         }
 
     # Include routes
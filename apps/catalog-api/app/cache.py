@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import random
+import uuid
+from collections import OrderedDict
 from typing import Any, Optional
-from time import perf_counter
+from time import monotonic, perf_counter
 
 try:
     from prometheus_client import Counter, Histogram
@@ -10,17 +13,26 @@ except Exception:  # pragma: no cover
     Counter = None  # type: ignore
     Histogram = None  # type: ignore
 
+from .codec import CacheSerializer
+from .hotkeys import HotKeyTracker, export_metrics
+
 try:
     from redis import asyncio as aioredis
 except Exception:  # pragma: no cover
     aioredis = None  # type: ignore
 
 _redis = None
+_cas_set = None
+_tag_add = None
+_serializer = CacheSerializer()
+_hot_keys: Optional[HotKeyTracker] = None
 _hit_counter = (
-    Counter("catalog_cache_hits_total", "Cache hits", ["cache"]) if Counter else None
+    Counter("catalog_cache_hits_total", "Cache hits", ["cache", "tier"])
+    if Counter
+    else None
 )
 _miss_counter = (
-    Counter("catalog_cache_misses_total", "Cache misses", ["cache"])
+    Counter("catalog_cache_misses_total", "Cache misses", ["cache", "tier"])
     if Counter
     else None
 )
@@ -29,54 +41,669 @@ _latency_hist = (
     if Histogram
     else None
 )
+_write_failures = (
+    Counter(
+        "catalog_cache_write_failures_total",
+        "Failed versioned cache writes; outcome=stale when the old entry survived",
+        ["cache", "outcome"],
+    )
+    if Counter
+    else None
+)
+
+INVALIDATION_CHANNEL = "catalog:cache:invalidate"
+# Identifies this process on the invalidation channel so it can skip its own messages
+_instance_id = uuid.uuid4().hex
+_invalidation_task: Optional[asyncio.Task] = None
+
+# Versioned write: sets KEYS[1] unless KEYS[2] holds a newer version than
+# ARGV[2]. The version key shares the entry's TTL and survives cache_delete, so
+# a slow writer holding an older row cannot resurrect it after an update.
+_CAS_SET_SCRIPT = """
+local current = redis.call('GET', KEYS[2])
+if current and tonumber(current) > tonumber(ARGV[2]) then
+  return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+TAG_PREFIX = "catalog:tag:"
+# Adds ARGV[1] to each tag set in KEYS that has room for it (fewer than
+# ARGV[3] members); a tag's TTL is only ever extended, to ARGV[2], so it
+# outlives every entry it points to. Returns how many tags were full.
+_TAG_ADD_SCRIPT = """
+local full = 0
+for _, tag in ipairs(KEYS) do
+  if redis.call('SISMEMBER', tag, ARGV[1]) == 1
+      or redis.call('SCARD', tag) < tonumber(ARGV[3]) then
+    redis.call('SADD', tag, ARGV[1])
+    if redis.call('TTL', tag) < tonumber(ARGV[2]) then
+      redis.call('EXPIRE', tag, ARGV[2])
+    end
+  else
+    full = full + 1
+  end
+end
+return full
+"""
+
+
+class LocalCache:
+    """Bounded in-process LRU with a per-entry TTL (the L1 tier in front of Redis).
+
+    Values are shared with callers, so they must be treated as read-only.
+    Versioned sets never replace a live entry that carries a newer version.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[str, tuple[float, Any, Optional[int]]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        return self.get_versioned(key)[0]
+
+    def get_versioned(self, key: str) -> tuple[Any, Optional[int]]:
+        entry = self._items.get(key)
+        if entry is None:
+            return None, None
+        expires_at, value, version = entry
+        if expires_at <= monotonic():
+            del self._items[key]
+            return None, None
+        self._items.move_to_end(key)
+        return value, version
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: float | None = None,
+        *,
+        version: Optional[int] = None,
+    ) -> bool:
+        now = monotonic()
+        if version is not None:
+            current = self._items.get(key)
+            if (
+                current is not None
+                and current[0] > now
+                and current[2] is not None
+                and current[2] > version
+            ):
+                return False
+        ttl = (
+            self.ttl_seconds
+            if ttl_seconds is None
+            else min(ttl_seconds, self.ttl_seconds)
+        )
+        self._items[key] = (now + ttl, value, version)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+        return True
+
+    def delete(self, key: str) -> None:
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_local: Optional[LocalCache] = None
+
+
+class TagIndex:
+    """Bounded in-process tag -> keys index, for when there is no Redis.
+
+    Holds at most `max_tags` tags, evicting the least recently tagged; the
+    keys of an evicted tag are returned so the caller can drop them, which
+    keeps eviction from leaving entries that can no longer be invalidated.
+    """
+
+    def __init__(self, max_tags: int, max_keys_per_tag: int):
+        self.max_tags = max_tags
+        self.max_keys_per_tag = max_keys_per_tag
+        self._tags: OrderedDict[str, set[str]] = OrderedDict()
+
+    def add(self, key: str, tags: list[str]) -> tuple[bool, set[str]]:
+        """Tag `key`; returns (False if a tag was full, keys of evicted tags)."""
+        tagged = True
+        for tag in tags:
+            keys = self._tags.setdefault(tag, set())
+            self._tags.move_to_end(tag)
+            if key in keys:
+                continue
+            if len(keys) >= self.max_keys_per_tag:
+                tagged = False
+                continue
+            keys.add(key)
+        evicted: set[str] = set()
+        while len(self._tags) > self.max_tags:
+            evicted |= self._tags.popitem(last=False)[1]
+        return tagged, evicted
+
+    def pop(self, tags: list[str]) -> set[str]:
+        keys: set[str] = set()
+        for tag in tags:
+            keys |= self._tags.pop(tag, set())
+        return keys
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+
+_local_tags: Optional[TagIndex] = None
+_max_keys_per_tag = 1000
+
+
+def _raw_key(key: str) -> str:
+    # L1 holds decoded values and raw response bytes for the same Redis key apart
+    return f"{key}#raw"
+
+
+def _version_key(key: str) -> str:
+    return f"{key}#ver"
+
+
+def init_codec(codec: str, compress_min_bytes: int = 0) -> None:
+    global _serializer
+    _serializer = CacheSerializer(codec, compress_min_bytes)
+
+
+def init_hot_keys(top_k: int, half_life_seconds: float) -> None:
+    """Track the hottest keys read through cache_get; top_k <= 0 disables it."""
+    global _hot_keys
+    if top_k <= 0:
+        _hot_keys = None
+        return
+    _hot_keys = HotKeyTracker(top_k, half_life_seconds=half_life_seconds)
+    export_metrics(_hot_keys)
+
+
+def hot_keys(limit: int | None = None) -> dict[str, Any]:
+    if _hot_keys is None:
+        return {"enabled": False, "total": 0, "keys": []}
+    total = _hot_keys.total
+    return {
+        "enabled": True,
+        "total": total,
+        "half_life_seconds": _hot_keys.half_life_seconds,
+        "keys": [
+            {"key": k, "count": c, "share": round(c / total, 4) if total else 0.0}
+            for k, c in _hot_keys.top(limit)
+        ],
+    }
 
 
 def init_redis(redis_url: str | None):
-    global _redis
+    global _redis, _cas_set, _tag_add
     if not redis_url or aioredis is None:
-        _redis = None
+        _redis = _cas_set = _tag_add = None
         return
     try:
-        _redis = aioredis.from_url(redis_url, decode_responses=True)
+        _redis = aioredis.from_url(redis_url, decode_responses=False)
+        _cas_set = _redis.register_script(_CAS_SET_SCRIPT)
+        _tag_add = _redis.register_script(_TAG_ADD_SCRIPT)
     except Exception:
-        _redis = None
+        _redis = _cas_set = _tag_add = None
 
 
-async def cache_get(
-    key: str, *, cache_name: str = "default"
-) -> Optional[dict[str, Any]]:
+def init_local_cache(max_entries: int, ttl_seconds: float) -> None:
+    """Enable the in-process L1 tier; a non-positive size disables it."""
+    global _local, _local_tags
+    if max_entries <= 0 or ttl_seconds <= 0:
+        _local = _local_tags = None
+        return
+    _local = LocalCache(max_entries, ttl_seconds)
+    # Sized for about ten tags per entry L1 can hold
+    _local_tags = TagIndex(max_entries * 10, _max_keys_per_tag)
+
+
+def init_tags(max_keys_per_tag: int) -> None:
+    """Cap how many keys one tag tracks; entries past the cap stay untagged."""
+    global _max_keys_per_tag
+    _max_keys_per_tag = max(1, max_keys_per_tag)
+    if _local_tags is not None:
+        _local_tags.max_keys_per_tag = _max_keys_per_tag
+
+
+async def _get(
+    key: str, *, raw: bool, cache_name: str, versioned: bool
+) -> tuple[Any, Optional[int]]:
+    if _hot_keys is not None:
+        _hot_keys.add(key)
+    l1_key = _raw_key(key) if raw else key
+    if _local is not None:
+        local_val, local_ver = _local.get_versioned(l1_key)
+        if local_val is not None:
+            if _hit_counter:
+                _hit_counter.labels(cache_name, "l1").inc()
+            return local_val, local_ver
+        if _miss_counter:
+            _miss_counter.labels(cache_name, "l1").inc()
     if _redis is None:
-        return None
+        return None, None
     try:
         start = perf_counter()
-        val = await _redis.get(key)
+        if versioned:
+            val, ver = await _redis.mget(key, _version_key(key))
+        else:
+            val, ver = await _redis.get(key), None
         if _latency_hist:
             _latency_hist.labels("get", cache_name).observe(perf_counter() - start)
-        if not val:
+        if not val or (raw and not val.startswith(b"{")):
             if _miss_counter:
-                _miss_counter.labels(cache_name).inc()
-            return None
+                _miss_counter.labels(cache_name, "redis").inc()
+            return None, None
         if _hit_counter:
-            _hit_counter.labels(cache_name).inc()
-        return json.loads(val)
+            _hit_counter.labels(cache_name, "redis").inc()
+        value = val if raw else _serializer.decode(val)
+        version = int(ver) if ver else None
+        if _local is not None:
+            _local.set(l1_key, value, version=version)
+        return value, version
+    except Exception:
+        return None, None
+
+
+async def cache_get(
+    key: str, *, cache_name: str = "default"
+) -> Optional[dict[str, Any]]:
+    value, _ = await _get(key, raw=False, cache_name=cache_name, versioned=False)
+    return value
+
+
+async def cache_get_versioned(
+    key: str, *, raw: bool = False, cache_name: str = "default"
+) -> tuple[Any, Optional[int]]:
+    """cache_get (or cache_get_raw) plus the version the entry was written with.
+
+    The value and its version key come back in one MGET; the version is None
+    for unversioned entries.
+    """
+    return await _get(key, raw=raw, cache_name=cache_name, versioned=True)
+
+
+async def cache_get_version(key: str) -> Optional[int]:
+    """Only the version of a cached entry: L1, else the Redis version key."""
+    if _local is not None:
+        for l1_key in (key, _raw_key(key)):
+            local_ver = _local.get_versioned(l1_key)[1]
+            if local_ver is not None:
+                return local_ver
+    if _redis is None:
+        return None
+    try:
+        ver = await _redis.get(_version_key(key))
+        return int(ver) if ver else None
     except Exception:
         return None
 
 
+async def _store(
+    key: str,
+    payload: bytes,
+    ttl_seconds: int,
+    version: Optional[int],
+    cache_name: str,
+) -> bool:
+    """SETEX, or a compare-and-set when `version` is given.
+
+    Returns False only when Redis kept an entry with a newer version.
+    """
+    if _redis is None:
+        return True
+    try:
+        start = perf_counter()
+        if version is None:
+            await _redis.setex(key, ttl_seconds, payload)
+            stored = True
+        else:
+            stored = bool(
+                await _cas_set(  # type: ignore[misc]
+                    keys=[key, _version_key(key)],
+                    args=[payload, version, ttl_seconds],
+                )
+            )
+        if _latency_hist:
+            _latency_hist.labels("set", cache_name).observe(perf_counter() - start)
+        return stored
+    except Exception:
+        if version is not None:
+            await _drop_stale([key], cache_name)
+        return True
+
+
+async def _drop_stale(keys: list[str], cache_name: str) -> None:
+    # A failed write-through leaves the previous version in Redis for the rest
+    # of its TTL (an hour for products by default), so remove it instead
+    if not keys:
+        return
+    try:
+        await _redis.delete(*keys)  # type: ignore[union-attr]
+        outcome = "deleted"
+    except Exception:
+        outcome = "stale"
+    if _write_failures:
+        _write_failures.labels(cache_name, outcome).inc(len(keys))
+
+
 async def cache_set(
-    key: str, value: dict[str, Any], ttl_seconds: int, *, cache_name: str = "default"
+    key: str,
+    value: dict[str, Any],
+    ttl_seconds: int,
+    *,
+    cache_name: str = "default",
+    version: Optional[int] = None,
 ) -> None:
+    """Write a value; with `version`, an entry holding a newer version is kept."""
+    stored = await _store(
+        key, _serializer.encode(value), ttl_seconds, version, cache_name
+    )
+    if stored and _local is not None:
+        if _local.set(key, value, ttl_seconds, version=version):
+            _local.delete(_raw_key(key))
+
+
+async def cache_get_raw(key: str, *, cache_name: str = "default") -> Optional[bytes]:
+    """Return the stored bytes when they are a ready-to-send JSON document.
+
+    Entries written by cache_set carry a codec header and count as a miss here;
+    the caller's load path then rewrites them with cache_set_raw.
+    """
+    value, _ = await _get(key, raw=True, cache_name=cache_name, versioned=False)
+    return value
+
+
+async def cache_set_raw(
+    key: str,
+    body: bytes,
+    ttl_seconds: int,
+    *,
+    cache_name: str = "default",
+    version: Optional[int] = None,
+) -> None:
+    """Store a JSON response body verbatim (no codec header).
+
+    cache_get still reads these entries, as plain JSON.
+    """
+    stored = await _store(key, body, ttl_seconds, version, cache_name)
+    if stored and _local is not None:
+        if _local.set(_raw_key(key), body, ttl_seconds, version=version):
+            _local.delete(key)
+
+
+async def cache_delete(key: str, *, cache_name: str = "default") -> None:
+    if _local is not None:
+        _local.delete(key)
+        _local.delete(_raw_key(key))
     if _redis is None:
         return
     try:
         start = perf_counter()
-        await _redis.setex(key, ttl_seconds, json.dumps(value))
+        await _redis.delete(key)
         if _latency_hist:
-            _latency_hist.labels("set", cache_name).observe(perf_counter() - start)
+            _latency_hist.labels("delete", cache_name).observe(perf_counter() - start)
     except Exception:
         return
 
 
+async def cache_get_many(
+    keys: list[str], *, cache_name: str = "default"
+) -> dict[str, dict[str, Any]]:
+    """Fetch several keys at once (L1 first, then one Redis MGET); misses are omitted."""
+    if _hot_keys is not None:
+        for key in keys:
+            _hot_keys.add(key)
+    found: dict[str, dict[str, Any]] = {}
+    pending = keys
+    if _local is not None:
+        pending = []
+        for key in keys:
+            local_val = _local.get(key)
+            if local_val is not None:
+                found[key] = local_val
+            else:
+                pending.append(key)
+        if _hit_counter and found:
+            _hit_counter.labels(cache_name, "l1").inc(len(found))
+        if _miss_counter and pending:
+            _miss_counter.labels(cache_name, "l1").inc(len(pending))
+    if _redis is None or not pending:
+        return found
+    try:
+        start = perf_counter()
+        vals = await _redis.mget(pending)
+        if _latency_hist:
+            _latency_hist.labels("mget", cache_name).observe(perf_counter() - start)
+        hits = 0
+        for key, val in zip(pending, vals):
+            if not val:
+                continue
+            decoded = _serializer.decode(val)
+            found[key] = decoded
+            hits += 1
+            if _local is not None:
+                _local.set(key, decoded)
+        if _hit_counter and hits:
+            _hit_counter.labels(cache_name, "redis").inc(hits)
+        if _miss_counter and len(pending) > hits:
+            _miss_counter.labels(cache_name, "redis").inc(len(pending) - hits)
+    except Exception:
+        return found
+    return found
+
+
+async def cache_set_many(
+    items: dict[str, Any],
+    ttl_seconds: int,
+    *,
+    cache_name: str = "default",
+    raw: bool = False,
+    versions: Optional[dict[str, int]] = None,
+) -> None:
+    """Write several keys in one pipelined round trip.
+
+    With raw=True the values are JSON bodies stored verbatim, as cache_set_raw.
+    Keys listed in `versions` are compare-and-set like cache_set(version=...).
+    """
+    versions = versions or {}
+    stored = set(items)
+    if _redis is not None and items:
+        try:
+            start = perf_counter()
+            async with _redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    payload = value if raw else _serializer.encode(value)
+                    if key in versions:
+                        await _cas_set(  # type: ignore[misc]
+                            keys=[key, _version_key(key)],
+                            args=[payload, versions[key], ttl_seconds],
+                            client=pipe,
+                        )
+                    else:
+                        pipe.setex(key, ttl_seconds, payload)
+                results = await pipe.execute()
+            stored = {
+                key for key, ok in zip(items, results) if key not in versions or ok
+            }
+            if _latency_hist:
+                _latency_hist.labels("mset", cache_name).observe(perf_counter() - start)
+        except Exception:
+            await _drop_stale([k for k in items if k in versions], cache_name)
+    if _local is not None:
+        for key in stored:
+            if _local.set(
+                _raw_key(key) if raw else key,
+                items[key],
+                ttl_seconds,
+                version=versions.get(key),
+            ):
+                _local.delete(key if raw else _raw_key(key))
+
+
+HOT_KEYS_PREFIX = "catalog:hot:"
+
+
+async def cache_tag(key: str, tags: list[str], ttl_seconds: int) -> bool:
+    """Record `key` under each tag so cache_invalidate_tags can find it.
+
+    Returns False when some tag was full (or on error): the caller should
+    then keep the entry short-lived, since that tag cannot invalidate it.
+    """
+    if not tags:
+        return True
+    if _redis is None:
+        if _local is None or _local_tags is None:
+            return True  # nothing is cached
+        tagged, evicted = _local_tags.add(key, tags)
+        for k in evicted:
+            _local.delete(k)
+            _local.delete(_raw_key(k))
+        return tagged
+    try:
+        full = await _tag_add(  # type: ignore[misc]
+            keys=[TAG_PREFIX + t for t in tags],
+            args=[key, ttl_seconds, _max_keys_per_tag],
+        )
+        return not full
+    except Exception:
+        return False
+
+
+async def cache_invalidate_tags(tags: list[str]) -> int:
+    """Delete every key recorded under any of `tags`, on all tiers and replicas.
+
+    Returns the number of keys deleted.
+    """
+    if not tags:
+        return 0
+    if _redis is None:
+        keys = _local_tags.pop(tags) if _local_tags is not None else set()
+        if _local is not None:
+            for k in keys:
+                _local.delete(k)
+                _local.delete(_raw_key(k))
+        return len(keys)
+    try:
+        pipe = _redis.pipeline(transaction=True)
+        for tag in tags:
+            pipe.smembers(TAG_PREFIX + tag)
+        pipe.delete(*(TAG_PREFIX + t for t in tags))
+        *members, _ = await pipe.execute()
+        keys = {k.decode() if isinstance(k, bytes) else k for m in members for k in m}
+        if keys:
+            await _redis.delete(*keys)
+    except Exception:
+        return 0
+    if _local is not None and keys:
+        # Other replicas drop their L1 copies, as with publish_invalidation
+        pipe = _redis.pipeline(transaction=False)
+        for k in keys:
+            _local.delete(k)
+            _local.delete(_raw_key(k))
+            pipe.publish(INVALIDATION_CHANNEL, f"{_instance_id} {k}")
+        try:
+            await pipe.execute()
+        except Exception:
+            pass
+    return len(keys)
+
+
+async def record_hot(name: str, member: str, *, sample_rate: float, keep: int) -> None:
+    """Count a sampled read of `member` in the persisted hot-key record `name`.
+
+    The same round trip trims the record to its top `keep` members.
+    """
+    if _redis is None or sample_rate <= 0 or random.random() >= sample_rate:
+        return
+    try:
+        zkey = HOT_KEYS_PREFIX + name
+        pipe = _redis.pipeline(transaction=False)
+        pipe.zincrby(zkey, 1, member)
+        pipe.zremrangebyrank(zkey, 0, -(keep + 1))
+        await pipe.execute()
+    except Exception:
+        return
+
+
+async def top_hot(name: str, limit: int) -> list[str]:
+    """Hottest members of `name`, most read first."""
+    if _redis is None or limit <= 0:
+        return []
+    try:
+        members = await _redis.zrevrange(HOT_KEYS_PREFIX + name, 0, limit - 1)
+        return [m.decode() if isinstance(m, bytes) else m for m in members]
+    except Exception:
+        return []
+
+
+async def publish_invalidation(key: str) -> None:
+    """Tell other replicas to drop `key` from their L1 tier."""
+    if _redis is None or _local is None:
+        return
+    try:
+        await _redis.publish(INVALIDATION_CHANNEL, f"{_instance_id} {key}")
+    except Exception:
+        return
+
+
+async def _invalidation_loop() -> None:
+    while True:
+        pubsub = None
+        try:
+            pubsub = _redis.pubsub()  # type: ignore[union-attr]
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Messages may have been missed while (re)connecting
+            if _local is not None:
+                _local.clear()
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                data = message.get("data") or b""
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8", "replace")
+                origin, _, key = data.partition(" ")
+                if origin != _instance_id and _local is not None:
+                    _local.delete(key)
+                    _local.delete(_raw_key(key))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await asyncio.sleep(1)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+def start_invalidation_listener() -> None:
+    global _invalidation_task
+    if _redis is None or _local is None or _invalidation_task is not None:
+        return
+    _invalidation_task = asyncio.create_task(_invalidation_loop())
+
+
+async def stop_invalidation_listener() -> None:
+    global _invalidation_task
+    task, _invalidation_task = _invalidation_task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+
+
 async def ping() -> bool:
     if _redis is None:
         return False
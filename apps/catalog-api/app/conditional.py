@@ -0,0 +1,66 @@
+"""Validators for conditional GETs (RFC 9110 section 13).
+
+A resource's version is its row timestamp in epoch microseconds, which is
+also the version product cache entries are written with; the strong ETag is
+that number in hex and Last-Modified is it truncated to whole seconds.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+def version_of(at: datetime | None) -> int | None:
+    if at is None:
+        return None
+    return round(at.timestamp() * 1_000_000)
+
+
+def etag(version: int) -> str:
+    return f'"{version:x}"'
+
+
+def last_modified(version: int) -> str:
+    at = datetime.fromtimestamp(version // 1_000_000, timezone.utc)
+    return format_datetime(at, usegmt=True)
+
+
+def is_conditional(request: Request) -> bool:
+    headers = request.headers
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def not_modified(request: Request, version: int) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETags were sent."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses the weak comparison, so W/ prefixes still match
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return "*" in tags or etag(version) in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return version // 1_000_000 <= since.timestamp()
+
+
+def validator_headers(version: int | None, cache_control: str) -> dict[str, str]:
+    headers = {}
+    if version is not None:
+        headers["ETag"] = etag(version)
+        headers["Last-Modified"] = last_modified(version)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def not_modified_response(version: int, cache_control: str) -> Response:
+    return Response(status_code=304, headers=validator_headers(version, cache_control))
@@ -7,8 +7,59 @@ class Settings(BaseModel):
     port: int = int(os.getenv("PORT", "8001"))
 
     db_url: str | None = os.getenv("DB_URL")
+    # Connection pool sizing is per process: keep
+    # replicas * (db_pool_size + db_max_overflow) under Postgres max_connections
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    db_pool_recycle_seconds: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    db_connect_timeout_seconds: float = float(
+        os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "5")
+    )
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    db_prepared_statement_cache_size: int = int(
+        os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100")
+    )
+    # Comma-separated read replica URLs used for GET cache misses
+    db_replica_urls: list[str] = [
+        u.strip() for u in os.getenv("DB_REPLICA_URLS", "").split(",") if u.strip()
+    ]
+    db_replica_selection: str = os.getenv("DB_REPLICA_SELECTION", "round_robin")
+    db_replica_eject_after_failures: int = int(
+        os.getenv("DB_REPLICA_EJECT_AFTER_FAILURES", "3")
+    )
+    db_replica_eject_seconds: float = float(os.getenv("DB_REPLICA_EJECT_SECONDS", "30"))
+    # Eject a replica while its moving-average point-read time exceeds this; 0 disables
+    db_replica_max_latency_ms: float = float(
+        os.getenv("DB_REPLICA_MAX_LATENCY_MS", "0")
+    )
+    # After a client writes, its reads go to the primary for this long
+    read_your_writes_seconds: int = int(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+    # GET /products/changes holds back rows updated within this window.
+    # updated_at is stamped by the app before commit, so a slow transaction can
+    # commit behind rows already served; the window should cover the longest
+    # write transaction plus clock skew between app servers. 0 disables it
+    changes_settle_seconds: float = float(os.getenv("CHANGES_SETTLE_SECONDS", "5"))
+    # Page size of GET /products and /products/changes when `limit` is omitted;
+    # a larger `limit` is capped at the max so no request streams the whole table
+    list_page_size: int = int(os.getenv("LIST_PAGE_SIZE", "500"))
+    list_max_page_size: int = int(os.getenv("LIST_MAX_PAGE_SIZE", "5000"))
     redis_url: str | None = os.getenv("REDIS_URL")
     opensearch_url: str = os.getenv("OPENSEARCH_URL", "http://localhost:9200")
+    # In-process BM25 index used when OpenSearch is unset or failing:
+    # auto (only without DB_URL, i.e. memory mode) | on | off
+    local_search: str = os.getenv("LOCAL_SEARCH", "auto")
+    opensearch_timeout_seconds: float = float(
+        os.getenv("OPENSEARCH_TIMEOUT_SECONDS", "2")
+    )
+    opensearch_max_retries: int = int(os.getenv("OPENSEARCH_MAX_RETRIES", "2"))
+    opensearch_pool_maxsize: int = int(os.getenv("OPENSEARCH_POOL_MAXSIZE", "20"))
 
     enable_kafka: bool = os.getenv("ENABLE_KAFKA", "false").lower() in {
         "1",
@@ -20,9 +71,97 @@ class Settings(BaseModel):
     topic_product_updated: str = os.getenv(
         "TOPIC_PRODUCT_UPDATED", "events.catalog.product-updated"
     )
+    # Events are written to an outbox table in the write's transaction and
+    # relayed to Kafka in batches; off, they are published after the commit
+    outbox_enabled: bool = os.getenv("OUTBOX_ENABLED", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    outbox_batch_size: int = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+    outbox_poll_interval_seconds: float = float(
+        os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "1")
+    )
+    # Non-outbox events go through a bounded in-process queue; on overflow
+    # `block` makes the request wait, `drop_newest`/`drop_oldest` shed events
+    events_queue_max_size: int = int(os.getenv("EVENTS_QUEUE_MAX_SIZE", "10000"))
+    events_queue_overflow: str = os.getenv("EVENTS_QUEUE_OVERFLOW", "block")
+    events_max_batch: int = int(os.getenv("EVENTS_MAX_BATCH", "500"))
+    events_flush_timeout_seconds: float = float(
+        os.getenv("EVENTS_FLUSH_TIMEOUT_SECONDS", "10")
+    )
+    # Producer batching: none | gzip | snappy | lz4 | zstd (the last three need
+    # their codec packages installed)
+    kafka_linger_ms: int = int(os.getenv("KAFKA_LINGER_MS", "5"))
+    kafka_max_batch_bytes: int = int(os.getenv("KAFKA_MAX_BATCH_BYTES", "65536"))
+    kafka_compression: str = os.getenv("KAFKA_COMPRESSION", "gzip")
 
-    cache_ttl_seconds: int = int(os.getenv("CACHE_TTL_SECONDS", "30"))
-    search_cache_ttl_seconds: int = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "15"))
+    # Product entries are versioned by updated_at, so stale writes cannot
+    # overwrite newer ones and the TTL only bounds memory, not staleness
+    cache_ttl_seconds: int = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+    # Redis value encoding: json | orjson | msgpack; bodies of at least
+    # CACHE_COMPRESS_MIN_BYTES are zlib-compressed (0 disables)
+    cache_codec: str = os.getenv("CACHE_CODEC", "json")
+    cache_compress_min_bytes: int = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "0"))
+    # Cache product reads as final JSON response bytes and serve hits verbatim
+    cache_raw_responses: bool = os.getenv("CACHE_RAW_RESPONSES", "false").lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    # Cache-Control sent with GET /products/{id} (and its 304s); empty omits it.
+    # Responses carry ETag/Last-Modified from updated_at, so no-cache still
+    # lets clients revalidate with a cheap 304
+    product_cache_control: str = os.getenv("PRODUCT_CACHE_CONTROL", "no-cache")
+    # Heavy-hitter tracking of cache_get keys (GET /debug/hot-keys); 0 disables
+    hot_keys_top_k: int = int(os.getenv("HOT_KEYS_TOP_K", "100"))
+    hot_keys_half_life_seconds: float = float(
+        os.getenv("HOT_KEYS_HALF_LIFE_SECONDS", "60")
+    )
+    # Short-lived "not found" markers so unknown ids skip the DB; 0 disables
+    negative_cache_ttl_seconds: int = int(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "5"))
+    # Soft TTL: past it, cached search results are served stale while one
+    # background refresh runs. Hard TTL bounds how long an entry lives.
+    # Entries are tagged with the product ids they show and evicted when one
+    # of them is updated, so the TTLs mostly bound how soon new products show
+    search_cache_ttl_seconds: int = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "60"))
+    search_cache_hard_ttl_seconds: int = int(
+        os.getenv("SEARCH_CACHE_HARD_TTL_SECONDS", "600")
+    )
+    # Cached searches tracked per product; beyond it, results get the soft TTL only
+    search_tag_max_keys: int = int(os.getenv("SEARCH_TAG_MAX_KEYS", "1000"))
+    # Second eviction after an update, once the indexer has caught up; 0 disables
+    search_invalidation_delay_seconds: float = float(
+        os.getenv("SEARCH_INVALIDATION_DELAY_SECONDS", "2")
+    )
+    # In-process autocomplete trie over the SUGGEST_TRIE_SIZE hottest product
+    # names, rebuilt every SUGGEST_TRIE_REFRESH_SECONDS; 0 disables it
+    suggest_trie_size: int = int(os.getenv("SUGGEST_TRIE_SIZE", "1000"))
+    suggest_trie_refresh_seconds: float = float(
+        os.getenv("SUGGEST_TRIE_REFRESH_SECONDS", "300")
+    )
+    batch_max_ids: int = int(os.getenv("BATCH_MAX_IDS", "100"))
+    # POST /products:bulk: rows per multi-row INSERT and max NDJSON line size
+    bulk_chunk_size: int = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+    bulk_max_line_bytes: int = int(os.getenv("BULK_MAX_LINE_BYTES", "65536"))
+    # In-process L1 tier in front of Redis; 0 entries disables it
+    l1_cache_max_entries: int = int(os.getenv("L1_CACHE_MAX_ENTRIES", "0"))
+    l1_cache_ttl_seconds: float = float(os.getenv("L1_CACHE_TTL_SECONDS", "5"))
+    # Startup warm-up: preload the WARMUP_TOP_N hottest product ids (sampled
+    # reads recorded in Redis at HOT_KEY_SAMPLE_RATE) plus WARMUP_SEED_IDS
+    warmup_top_n: int = int(os.getenv("WARMUP_TOP_N", "1000"))
+    warmup_seed_ids: list[str] = [
+        i.strip() for i in os.getenv("WARMUP_SEED_IDS", "").split(",") if i.strip()
+    ]
+    warmup_batch_size: int = int(os.getenv("WARMUP_BATCH_SIZE", "100"))
+    warmup_concurrency: int = int(os.getenv("WARMUP_CONCURRENCY", "4"))
+    warmup_deadline_seconds: float = float(os.getenv("WARMUP_DEADLINE_SECONDS", "20"))
+    hot_key_sample_rate: float = float(os.getenv("HOT_KEY_SAMPLE_RATE", "0.01"))
+    # Members kept in that record (it also feeds the suggest trie); every
+    # sampled write trims the rest, so it should exceed both sizes
+    hot_key_record_size: int = int(os.getenv("HOT_KEY_RECORD_SIZE", "4000"))
     otlp_endpoint: str | None = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
     validate_avro: bool = os.getenv("VALIDATE_AVRO", "false").lower() in {
         "1",
@@ -30,6 +169,11 @@ class Settings(BaseModel):
         "yes",
         "on",
     }
+    # Event value encoding: json, or avro (schemaless Avro binary behind a
+    # single-object header carrying the schema fingerprint). Schemas are read
+    # from AVRO_SCHEMA_DIR, defaulting to the repo's contracts/avro
+    event_encoding: str = os.getenv("EVENT_ENCODING", "json")
+    avro_schema_dir: str | None = os.getenv("AVRO_SCHEMA_DIR")
 
 
 def get_settings() -> Settings:
@@ -1,24 +1,279 @@
 from __future__ import annotations
 
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Optional
+import itertools
+from time import monotonic, perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
 
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy import text
+from sqlalchemy import exc as sa_exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except Exception:  # pragma: no cover
+    Counter = None  # type: ignore
+    Gauge = None  # type: ignore
+    Histogram = None  # type: ignore
+
 _engine = None
 _session_maker: Optional[async_sessionmaker[AsyncSession]] = None
+_engine_options: dict[str, Any] = {}
+
+_replicas: list["_Replica"] = []
+_replica_rr = itertools.count()
+_replica_selection = "round_robin"
+_eject_after_failures = 3
+_eject_seconds = 30.0
+_max_latency_seconds = 0.0
+# Weight of the newest session in a replica's moving-average latency
+_LATENCY_ALPHA = 0.2
+# Errors that count against a replica and send the read to the primary
+_REPLICA_ERRORS = (sa_exc.SQLAlchemyError, OSError)
+
+T = TypeVar("T")
+
+_pool_checked_out = (
+    Gauge("catalog_db_pool_checked_out", "DB connections currently checked out")
+    if Gauge
+    else None
+)
+_pool_overflow = (
+    Gauge("catalog_db_pool_overflow", "DB connections open beyond pool_size")
+    if Gauge
+    else None
+)
+_pool_size = Gauge("catalog_db_pool_size", "Configured DB pool size") if Gauge else None
+_checkout_wait_hist = (
+    Histogram(
+        "catalog_db_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled DB connection",
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    )
+    if Histogram
+    else None
+)
+_checkout_timeouts = (
+    Counter("catalog_db_pool_checkout_timeouts_total", "DB pool checkout timeouts")
+    if Counter
+    else None
+)
+
+
+_replica_latency = (
+    Histogram(
+        "catalog_db_replica_session_seconds",
+        "Read replica point-read (run_read) duration",
+        ["replica"],
+    )
+    if Histogram
+    else None
+)
+_replica_errors = (
+    Counter("catalog_db_replica_errors_total", "Read replica errors", ["replica"])
+    if Counter
+    else None
+)
+_replica_healthy = (
+    Gauge("catalog_db_replica_healthy", "1 if the replica is in rotation", ["replica"])
+    if Gauge
+    else None
+)
+
 
+class _InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Records how long each checkout waits on the pool (including overflow
+    connects), so starvation is visible before request latency moves."""
 
-def init_engine(db_url: str) -> None:
-    global _engine, _session_maker
-    _engine = create_async_engine(db_url, future=True, echo=False)
+    def _do_get(self):  # type: ignore[override]
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            if _checkout_timeouts:
+                _checkout_timeouts.inc()
+            raise
+        finally:
+            if _checkout_wait_hist:
+                _checkout_wait_hist.observe(perf_counter() - start)
+
+
+def _connect_args(
+    db_url: str,
+    *,
+    connect_timeout_seconds: float,
+    statement_timeout_ms: int,
+    prepared_statement_cache_size: int,
+) -> dict[str, Any]:
+    driver = make_url(db_url).get_driver_name()
+    if driver == "asyncpg":
+        args: dict[str, Any] = {
+            "timeout": connect_timeout_seconds,
+            "prepared_statement_cache_size": prepared_statement_cache_size,
+        }
+        if statement_timeout_ms > 0:
+            args["server_settings"] = {"statement_timeout": str(statement_timeout_ms)}
+        return args
+    if driver == "psycopg":
+        args = {"connect_timeout": max(1, int(connect_timeout_seconds))}
+        if prepared_statement_cache_size <= 0:
+            # psycopg prepares server-side statements by default; None disables
+            args["prepare_threshold"] = None
+        if statement_timeout_ms > 0:
+            args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+        return args
+    return {}
+
+
+def _create_engine(db_url: str, options: dict[str, Any]):
+    kwargs: dict[str, Any] = {}
+    if make_url(db_url).get_backend_name() != "sqlite":
+        kwargs = {
+            "poolclass": _InstrumentedQueuePool,
+            "pool_size": options["pool_size"],
+            "max_overflow": options["max_overflow"],
+            "pool_timeout": options["pool_timeout_seconds"],
+            "pool_recycle": options["pool_recycle_seconds"],
+            "pool_pre_ping": options["pool_pre_ping"],
+            "connect_args": _connect_args(
+                db_url,
+                connect_timeout_seconds=options["connect_timeout_seconds"],
+                statement_timeout_ms=options["statement_timeout_ms"],
+                prepared_statement_cache_size=options["prepared_statement_cache_size"],
+            ),
+        }
+    return create_async_engine(db_url, future=True, echo=False, **kwargs)
+
+
+def init_engine(
+    db_url: str,
+    *,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout_seconds: float = 30,
+    pool_recycle_seconds: int = -1,
+    pool_pre_ping: bool = False,
+    connect_timeout_seconds: float = 10,
+    statement_timeout_ms: int = 0,
+    prepared_statement_cache_size: int = 100,
+) -> None:
+    global _engine, _session_maker, _engine_options
+    _engine_options = {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout_seconds": pool_timeout_seconds,
+        "pool_recycle_seconds": pool_recycle_seconds,
+        "pool_pre_ping": pool_pre_ping,
+        "connect_timeout_seconds": connect_timeout_seconds,
+        "statement_timeout_ms": statement_timeout_ms,
+        "prepared_statement_cache_size": prepared_statement_cache_size,
+    }
+    _engine = _create_engine(db_url, _engine_options)
     _session_maker = async_sessionmaker(_engine, expire_on_commit=False)
+    pool = _engine.pool
+    if isinstance(pool, QueuePool):
+        # Sampled at scrape time
+        if _pool_checked_out:
+            _pool_checked_out.set_function(pool.checkedout)
+        if _pool_overflow:
+            _pool_overflow.set_function(lambda: max(0, pool.overflow()))
+        if _pool_size:
+            _pool_size.set(pool.size())
+
+
+class _Replica:
+    def __init__(self, name: str, db_url: str):
+        self.name = name
+        self.engine = _create_engine(db_url, _engine_options)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.inflight = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.latency_ewma = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+
+def init_replicas(
+    replica_urls: list[str],
+    *,
+    selection: str = "round_robin",
+    eject_after_failures: int = 3,
+    eject_seconds: float = 30,
+    max_latency_ms: float = 0,
+) -> None:
+    """Register read replicas; call after init_engine so they share its pool options.
+
+    A replica is ejected for `eject_seconds` after `eject_after_failures`
+    consecutive errors, or while its moving-average run_read time exceeds
+    `max_latency_ms` (0 disables the latency check).
+    """
+    global _replicas, _replica_selection, _eject_after_failures, _eject_seconds
+    global _max_latency_seconds
+    _replicas = [
+        _Replica(f"{make_url(url).host}-{i}", url) for i, url in enumerate(replica_urls)
+    ]
+    _replica_selection = selection
+    _eject_after_failures = eject_after_failures
+    _eject_seconds = eject_seconds
+    _max_latency_seconds = max_latency_ms / 1000
+    for r in _replicas:
+        if _replica_healthy:
+            _replica_healthy.labels(r.name).set(1)
+
+
+def has_replicas() -> bool:
+    return bool(_replicas)
+
+
+def _pick_replica() -> Optional[_Replica]:
+    now = monotonic()
+    healthy = [r for r in _replicas if r.healthy(now)]
+    if not healthy:
+        return None
+    if _replica_selection == "least_connections":
+        return min(healthy, key=lambda r: r.inflight)
+    return healthy[next(_replica_rr) % len(healthy)]
+
+
+def _eject(replica: _Replica) -> None:
+    # Ejected replicas are retried after the cooldown, with a clean record
+    replica.failures = 0
+    replica.latency_ewma = 0.0
+    replica.ejected_until = monotonic() + _eject_seconds
+    if _replica_healthy:
+        _replica_healthy.labels(replica.name).set(0)
+
+
+def _record_replica_failure(replica: _Replica) -> None:
+    if _replica_errors:
+        _replica_errors.labels(replica.name).inc()
+    replica.failures += 1
+    if replica.failures >= _eject_after_failures:
+        _eject(replica)
+
+
+def _record_replica_success(replica: _Replica, seconds: Optional[float]) -> None:
+    replica.failures = 0
+    if replica.ejected_until:
+        replica.ejected_until = 0.0
+        if _replica_healthy:
+            _replica_healthy.labels(replica.name).set(1)
+    if seconds is None:
+        return
+    if _replica_latency:
+        _replica_latency.labels(replica.name).observe(seconds)
+    # Starts at 0, so only sustained slowness (not one slow read) ejects
+    replica.latency_ewma += _LATENCY_ALPHA * (seconds - replica.latency_ewma)
+    if _max_latency_seconds > 0 and replica.latency_ewma > _max_latency_seconds:
+        _eject(replica)
 
 
 def is_ready() -> bool:
@@ -38,6 +293,64 @@ async def session_scope() -> AsyncIterator[AsyncSession]:
             raise
 
 
+@asynccontextmanager
+async def _primary_read_session() -> AsyncIterator[AsyncSession]:
+    if _session_maker is None:
+        raise RuntimeError("DB not initialized")
+    # Never committed: closing the session rolls the read transaction back
+    async with _session_maker() as session:
+        yield session
+
+
+@asynccontextmanager
+async def _replica_session(
+    replica: _Replica, *, sample_latency: bool
+) -> AsyncIterator[AsyncSession]:
+    replica.inflight += 1
+    start = perf_counter()
+    try:
+        async with replica.session_maker() as session:
+            yield session
+    except _REPLICA_ERRORS:
+        _record_replica_failure(replica)
+        raise
+    else:
+        _record_replica_success(
+            replica, perf_counter() - start if sample_latency else None
+        )
+    finally:
+        replica.inflight -= 1
+
+
+def read_session_scope(*, use_primary: bool = False):
+    """Read-only session on a healthy replica, falling back to the primary.
+
+    Nothing is committed. Errors reach the caller; prefer run_read, which
+    retries a failed replica read on the primary, where the read can be re-run.
+    The session may stay open while results stream to a client, so its
+    duration is not a latency sample.
+    """
+    replica = None if use_primary else _pick_replica()
+    if replica is None:
+        return _primary_read_session()
+    return _replica_session(replica, sample_latency=False)
+
+
+async def run_read(
+    fn: Callable[[AsyncSession], Awaitable[T]], *, use_primary: bool = False
+) -> T:
+    """Run `fn(session)` read-only; a replica error is retried once on the primary."""
+    replica = None if use_primary else _pick_replica()
+    if replica is not None:
+        try:
+            async with _replica_session(replica, sample_latency=True) as session:
+                return await fn(session)
+        except _REPLICA_ERRORS:
+            pass  # recorded against the replica
+    async with _primary_read_session() as session:
+        return await fn(session)
+
+
 async def healthcheck() -> bool:
     if _engine is None:
         return False
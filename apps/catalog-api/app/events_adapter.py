@@ -1,59 +1,96 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Dict
+import json
+import sys
+from typing import Any, Dict, List, Optional
 
-from events import publish_product_updated_async
+from events import publish_encoded_async
 from .config import get_settings
-import os
+from .event_codec import AvroEventCodec, load_codec
+from .outbox import OutboxRecord
 
 try:
-    from fastavro import parse_schema, validate
+    from fastavro import validate
 except Exception:  # pragma: no cover
-    parse_schema = None  # type: ignore
     validate = None  # type: ignore
-_parsed_schema = None
 
+_codec: Optional[AvroEventCodec] = None
+_encode_avro = False
+_validate_json = False
 
-async def emit_product_updated(product: Dict[str, Any]) -> None:
-    payload = {
+
+def init_event_encoding(
+    encoding: str, *, validate_avro: bool = False, schema_dir: str | None = None
+) -> None:
+    """Parse the ProductUpdated schema once; `avro` publishes its binary form.
+
+    Falls back to JSON (unvalidated) when the schema or fastavro is missing.
+    """
+    global _codec, _encode_avro, _validate_json
+    _codec, _encode_avro, _validate_json = None, False, False
+    if encoding != "avro" and not validate_avro:
+        return
+    try:
+        _codec = load_codec("ProductUpdated", schema_dir)
+    except Exception as e:
+        print(
+            f"[events] Avro schema unavailable ({e}); publishing JSON", file=sys.stderr
+        )
+        return
+    _encode_avro = encoding == "avro"
+    _validate_json = validate_avro and not _encode_avro and validate is not None
+
+
+def _build_payload(product: Dict[str, Any]) -> Dict[str, Any]:
+    return {
         "id": product["id"],
         "name": product["name"],
         "price": product["price"],
         "description": product.get("description"),
         "updated_at": int(datetime.now(timezone.utc).timestamp() * 1000),
     }
-    settings = get_settings()
-    if settings.validate_avro and parse_schema and validate:
+
+
+def _avro_record(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # The contract carries timestamps as ISO strings; millisecond precision
+    # keeps updated_at exactly convertible back to the indexer's version
+    at = datetime.fromtimestamp(payload["updated_at"] / 1000, timezone.utc)
+    at_iso = at.isoformat(timespec="milliseconds")
+    return {
+        "event_id": f"{payload['id']}@{payload['updated_at']}",
+        "occurred_at": at_iso,
+        "product_id": payload["id"],
+        "name": payload["name"],
+        "description": payload.get("description") or "",
+        "price": float(payload["price"]),
+        "stock_qty": 0,
+        "updated_at": at_iso,
+    }
+
+
+def encode_product_updated(product: Dict[str, Any]) -> bytes:
+    payload = _build_payload(product)
+    if _encode_avro:
+        return _codec.encode(_avro_record(payload))  # type: ignore[union-attr]
+    if _validate_json:
         try:
-            global _parsed_schema
-            if _parsed_schema is None:
-                schema_path = os.path.join(
-                    os.path.dirname(os.path.dirname(__file__)),
-                    "..",
-                    "contracts",
-                    "avro",
-                    "ProductUpdated.avsc",
-                )
-                schema_path = os.path.abspath(schema_path)
-                import json
-
-                with open(schema_path) as f:
-                    _parsed_schema = parse_schema(json.load(f))
-            validate(
-                {
-                    "event_id": payload["id"],
-                    "occurred_at": datetime.now(timezone.utc).isoformat(),
-                    "product_id": payload["id"],
-                    "name": payload.get("name") or "",
-                    "description": payload.get("description") or "",
-                    "price": float(payload.get("price") or 0),
-                    "stock_qty": 0,
-                    "updated_at": datetime.now(timezone.utc).isoformat(),
-                },
-                _parsed_schema,
-            )
+            validate(_avro_record(payload), _codec.schema)  # type: ignore[union-attr]
         except Exception:
             # best-effort: don't block publishing
             pass
-    await publish_product_updated_async(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def product_updated_records(products: List[Dict[str, Any]]) -> List[OutboxRecord]:
+    """ProductUpdated events encoded for the outbox, keyed by product id."""
+    topic = get_settings().topic_product_updated
+    return [(topic, p["id"], encode_product_updated(p)) for p in products]
+
+
+async def emit_product_updated(product: Dict[str, Any]) -> None:
+    await publish_encoded_async(product_updated_records([product]))
+
+
+async def emit_products_updated(products: List[Dict[str, Any]]) -> None:
+    await publish_encoded_async(product_updated_records(products))
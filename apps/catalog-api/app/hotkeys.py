@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import heapq
+import struct
+from hashlib import blake2b
+from time import monotonic
+
+try:
+    from prometheus_client import Gauge
+except Exception:  # pragma: no cover
+    Gauge = None  # type: ignore
+
+# Ranks exported as metrics; labelled by rank, not key, to bound cardinality
+METRIC_RANKS = 10
+
+_share_gauge = (
+    Gauge(
+        "catalog_cache_hot_key_share",
+        "Share of recent cache reads going to the N-th hottest key",
+        ["rank"],
+    )
+    if Gauge
+    else None
+)
+
+
+class HotKeyTracker:
+    """Streaming heavy hitters: a count-min sketch plus a top-K min-heap.
+
+    Counts are halved every `half_life_seconds`, so the ranking follows recent
+    traffic. Memory is fixed at width * depth counters plus K keys.
+
+    Row indexes are separate 32-bit words of one blake2b digest, so rows are
+    independent and collisions do not depend on PYTHONHASHSEED.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 100,
+        *,
+        width: int = 2048,
+        depth: int = 4,
+        half_life_seconds: float = 60,
+    ):
+        if not 1 <= depth <= 16:
+            raise ValueError("depth must be between 1 and 16")
+        self.top_k = top_k
+        self.width = width
+        self.depth = depth
+        self.half_life_seconds = half_life_seconds
+        self.total = 0
+        self._rows = [[0] * width for _ in range(depth)]
+        # key -> estimate for the current top K; the heap holds exactly one
+        # entry per tracked key, whose count may lag behind (only ever lower)
+        self._top: dict[str, int] = {}
+        self._heap: list[tuple[int, str]] = []
+        self._decay_at = monotonic() + half_life_seconds
+        self._unpack = struct.Struct(f"<{depth}I").unpack
+
+    def _indexes(self, key: str) -> tuple[int, ...]:
+        digest = blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        width = self.width
+        return tuple(h % width for h in self._unpack(digest))
+
+    def add(self, key: str, n: int = 1) -> None:
+        if monotonic() >= self._decay_at:
+            self.decay()
+        self.total += n
+        est = None
+        for row, i in zip(self._rows, self._indexes(key)):
+            row[i] += n
+            if est is None or row[i] < est:
+                est = row[i]
+        top = self._top
+        if key in top:
+            top[key] = est  # type: ignore[assignment]
+            return
+        heap = self._heap
+        if len(top) < self.top_k:
+            top[key] = est  # type: ignore[assignment]
+            heapq.heappush(heap, (est, key))  # type: ignore[arg-type]
+            return
+        if est <= heap[0][0]:  # type: ignore[operator]
+            return  # the root never overstates the smallest tracked count
+        # Refresh lagging entries until the heap root holds the true minimum
+        while heap[0][0] != top[heap[0][1]]:
+            _, stale = heap[0]
+            heapq.heapreplace(heap, (top[stale], stale))
+        if est > heap[0][0]:  # type: ignore[operator]
+            _, evicted = heapq.heapreplace(heap, (est, key))  # type: ignore[arg-type]
+            del top[evicted]
+            top[key] = est  # type: ignore[assignment]
+
+    def decay(self) -> None:
+        for row in self._rows:
+            row[:] = [c >> 1 for c in row]
+        self.total >>= 1
+        self._top = {k: c >> 1 for k, c in self._top.items() if c > 1}
+        self._heap = [(c, k) for k, c in self._top.items()]
+        heapq.heapify(self._heap)
+        self._decay_at = monotonic() + self.half_life_seconds
+
+    def estimate(self, key: str) -> int:
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+
+    def top(self, limit: int | None = None) -> list[tuple[str, int]]:
+        ranked = sorted(self._top.items(), key=lambda kv: kv[1], reverse=True)
+        return ranked[:limit] if limit is not None else ranked
+
+    def share_at(self, rank: int) -> float:
+        ranked = self.top(rank)
+        if len(ranked) < rank or self.total <= 0:
+            return 0.0
+        return ranked[rank - 1][1] / self.total
+
+
+def export_metrics(tracker: HotKeyTracker) -> None:
+    """Compute the per-rank share gauges at scrape time, off the request path."""
+    if not _share_gauge:
+        return
+    for rank in range(1, METRIC_RANKS + 1):
+        _share_gauge.labels(str(rank)).set_function(lambda r=rank: tracker.share_at(r))
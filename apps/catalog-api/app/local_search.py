@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import math
+import re
+from typing import Any, AsyncIterator, Callable, Optional
+
+try:
+    from prometheus_client import Gauge
+except Exception:  # pragma: no cover
+    Gauge = None  # type: ignore
+
+# Same fields and boosts as the multi_match in search.build_query
+FIELDS = {"name": 2.0, "description": 1.0}
+_TOKEN = re.compile(r"\w+")
+
+_docs_gauge = (
+    Gauge("catalog_local_search_documents", "Products in the in-process search index")
+    if Gauge
+    else None
+)
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Roughly OpenSearch's standard analyzer: unicode words, case-folded."""
+    return _TOKEN.findall(text.casefold()) if text else []
+
+
+def _epoch_millis(value: Any) -> int:
+    if value is None:
+        return 0
+    if hasattr(value, "timestamp"):
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+class BM25Index:
+    """Inverted index with per-field BM25, scored like a best_fields multi_match.
+
+    A document's score is the best boosted field score, the default for
+    multi_match (tie_breaker 0). Query terms are OR-ed. Upserts and removals
+    are incremental; IDF and average lengths are computed at query time.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # Internal doc numbers index the per-doc lists below; freed numbers are reused
+        self._slot: dict[str, int] = {}
+        self._free: list[int] = []
+        self._ids: list[Optional[str]] = []
+        self._names: list[Optional[str]] = []
+        self._descriptions: list[Optional[str]] = []
+        self._prices: list[float] = []
+        self._updated: list[int] = []  # epoch millis, as indexed in OpenSearch
+        self._postings: dict[str, dict[str, dict[int, int]]] = {f: {} for f in FIELDS}
+        self._lengths: dict[str, list[int]] = {f: [] for f in FIELDS}
+        self._total_len: dict[str, int] = {f: 0 for f in FIELDS}
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def upsert(self, product: dict[str, Any]) -> None:
+        pid = product["id"]
+        if pid in self._slot:
+            self.remove(pid)
+        if self._free:
+            doc = self._free.pop()
+        else:
+            doc = len(self._ids)
+            for column in (self._ids, self._names, self._descriptions):
+                column.append(None)
+            self._prices.append(0.0)
+            self._updated.append(0)
+            for lengths in self._lengths.values():
+                lengths.append(0)
+        self._slot[pid] = doc
+        self._ids[doc] = pid
+        self._names[doc] = product["name"]
+        self._descriptions[doc] = product.get("description")
+        self._prices[doc] = float(product["price"])
+        self._updated[doc] = _epoch_millis(product.get("updated_at"))
+        for field, text in (
+            ("name", product["name"]),
+            ("description", product.get("description")),
+        ):
+            tokens = tokenize(text)
+            self._lengths[field][doc] = len(tokens)
+            self._total_len[field] += len(tokens)
+            postings = self._postings[field]
+            for term in tokens:
+                posting = postings.setdefault(term, {})
+                posting[doc] = posting.get(doc, 0) + 1
+
+    def remove(self, pid: str) -> None:
+        doc = self._slot.pop(pid, None)
+        if doc is None:
+            return
+        for field, text in (
+            ("name", self._names[doc]),
+            ("description", self._descriptions[doc]),
+        ):
+            postings = self._postings[field]
+            for term in set(tokenize(text)):
+                posting = postings.get(term)
+                if posting is not None:
+                    posting.pop(doc, None)
+                    if not posting:
+                        del postings[term]
+            self._total_len[field] -= self._lengths[field][doc]
+            self._lengths[field][doc] = 0
+        self._ids[doc] = self._names[doc] = self._descriptions[doc] = None
+        self._free.append(doc)
+
+    def _scores(self, terms: list[str], top_k: int | None = None) -> dict[int, float]:
+        """Score docs matching any term; best boosted field score per doc.
+
+        With `top_k`, MaxScore pruning applies: terms run rarest first, and once
+        the terms left cannot lift an unseen doc past the current k-th best
+        score, they only update docs already seen. The top k stay exact.
+        """
+        n = len(self._slot)
+        k1 = self.k1
+        norm = k1 * (1 - self.b)
+        plan = []
+        for term in terms:
+            fields = []
+            for field, boost in FIELDS.items():
+                posting = self._postings[field].get(term)
+                if posting:
+                    df = len(posting)
+                    # Boost folded into the IDF factor; also the term's score bound
+                    w = boost * math.log(1 + (n - df + 0.5) / (df + 0.5)) * (k1 + 1)
+                    fields.append((field, posting, w))
+            if fields:
+                plan.append((max(w for _, _, w in fields), fields))
+        plan.sort(key=lambda p: p[0], reverse=True)
+        remaining = dict.fromkeys(FIELDS, 0.0)
+        for _, fields in plan:
+            for field, _, w in fields:
+                remaining[field] += w
+
+        acc: dict[str, dict[int, float]] = {f: {} for f in FIELDS}
+        seen: Optional[dict[int, float]] = None
+        for _, fields in plan:
+            if top_k and seen is None and any(acc.values()):
+                best = self._best(acc)
+                if len(best) >= top_k:
+                    theta = heapq.nlargest(top_k, best.values())[-1]
+                    if max(remaining.values()) < theta:
+                        seen = best
+            for field, posting, w in fields:
+                lengths = self._lengths[field]
+                scale = k1 * self.b / ((self._total_len[field] / n) or 1.0)
+                if seen is None:
+                    part = {
+                        doc: w * tf / (tf + norm + scale * lengths[doc])
+                        for doc, tf in posting.items()
+                    }
+                elif len(seen) < len(posting):
+                    part = {
+                        doc: w * tf / (tf + norm + scale * lengths[doc])
+                        for doc in seen
+                        if (tf := posting.get(doc))
+                    }
+                else:
+                    part = {
+                        doc: w * tf / (tf + norm + scale * lengths[doc])
+                        for doc, tf in posting.items()
+                        if doc in seen
+                    }
+                scores = acc[field]
+                if len(part) > len(scores):
+                    scores, part = part, scores
+                    acc[field] = scores
+                for doc, s in part.items():
+                    scores[doc] = scores.get(doc, 0.0) + s
+                remaining[field] -= w
+        return self._best(acc)
+
+    @staticmethod
+    def _best(acc: dict[str, dict[int, float]]) -> dict[int, float]:
+        best, other = acc.values()
+        if len(other) > len(best):
+            best, other = other, best
+        best = dict(best)
+        for doc, s in other.items():
+            if s > best.get(doc, 0.0):
+                best[doc] = s
+        return best
+
+    def search(
+        self,
+        q: str,
+        *,
+        size: int = 10,
+        sort: str = "relevance",
+        min_price: float | None = None,
+        max_price: float | None = None,
+        search_after: list[Any] | None = None,
+    ) -> tuple[list[dict[str, Any]], list[Any] | None]:
+        """One page of hits plus the sort values of the last hit when the page is full.
+
+        Sort values follow search.SORTS, so the caller can encode them as the
+        same opaque cursor OpenSearch pages use.
+        """
+        terms = list(dict.fromkeys(tokenize(q)))
+        if not terms or not self._slot:
+            return [], None
+        filtered = min_price is not None or max_price is not None
+        # Pruning is only exact for the plain first relevance page
+        prune = sort == "relevance" and not filtered and not search_after
+        scores = self._scores(terms, top_k=size if prune else None)
+        ids, prices = self._ids, self._prices
+        if filtered:
+            lo = min_price if min_price is not None else -math.inf
+            hi = max_price if max_price is not None else math.inf
+            scores = {d: s for d, s in scores.items() if lo <= prices[d] <= hi}
+
+        # Sort values as in SORTS: a primary value, then the id ascending
+        desc = sort in ("relevance", "price_desc", "newest")
+        if sort == "relevance":
+            values = scores
+        else:
+            column = self._updated if sort == "newest" else prices
+            values = {d: column[d] for d in scores}
+        if search_after:
+            a, a_id = search_after
+            values = {
+                d: v
+                for d, v in values.items()
+                if (v < a if desc else v > a) or (v == a and ids[d] > a_id)
+            }
+        if len(values) > size:
+            # Only docs tied with or beyond the size-th value can make the page
+            if desc:
+                threshold = heapq.nlargest(size, values.values())[-1]
+                values = {d: v for d, v in values.items() if v >= threshold}
+            else:
+                threshold = heapq.nsmallest(size, values.values())[-1]
+                values = {d: v for d, v in values.items() if v <= threshold}
+        sign = -1 if desc else 1
+        page = sorted((sign * v, ids[d], d) for d, v in values.items())[:size]
+        items = [
+            {
+                "id": pid,
+                "name": self._names[d],
+                "price": prices[d],
+                "description": self._descriptions[d],
+            }
+            for _, pid, d in page
+        ]
+        last = [sign * page[-1][0], page[-1][1]] if len(page) == size else None
+        return items, last
+
+
+_index: Optional[BM25Index] = None
+_seed_task: Optional[asyncio.Task] = None
+
+
+def init_local_search(enabled: bool) -> None:
+    global _index
+    _index = BM25Index() if enabled else None
+
+
+def get_local_index() -> Optional[BM25Index]:
+    return _index
+
+
+def index_products(products: list[dict[str, Any]]) -> None:
+    if _index is None:
+        return
+    for p in products:
+        _index.upsert(p)
+    if _docs_gauge:
+        _docs_gauge.set(len(_index))
+
+
+def start_seeding(loader: Callable[[], AsyncIterator[dict[str, Any]]]) -> None:
+    """Load existing products into the index in the background."""
+    global _seed_task
+    if _index is None or _seed_task is not None:
+        return
+
+    async def run() -> None:
+        batch: list[dict[str, Any]] = []
+        try:
+            async for product in loader():
+                batch.append(product)
+                if len(batch) >= 1000:
+                    index_products(batch)
+                    batch = []
+                    await asyncio.sleep(0)  # let requests in between batches
+            index_products(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return
+
+    _seed_task = asyncio.create_task(run())
+
+
+async def stop_seeding() -> None:
+    global _seed_task
+    task, _seed_task = _seed_task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
@@ -2,7 +2,16 @@ from __future__ import annotations
 
 import datetime as dt
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Text, Numeric, DateTime
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    Numeric,
+    String,
+    Text,
+)
 
 
 class Base(DeclarativeBase):
@@ -11,6 +20,10 @@ class Base(DeclarativeBase):
 
 class ProductORM(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+        Index("ix_products_price_id", "price", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(64), primary_key=True)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -19,3 +32,25 @@ class ProductORM(Base):
     updated_at: Mapped[dt.datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=dt.datetime.utcnow
     )
+
+
+class OutboxORM(Base):
+    """Events written in the same transaction as the row they describe.
+
+    The relay in outbox.py publishes them in id order and deletes them. The
+    table name is service-specific because the services may share a database.
+    """
+
+    __tablename__ = "catalog_outbox"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True
+    )
+    topic: Mapped[str] = mapped_column(String(255), nullable=False)
+    key: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: dt.datetime.now(dt.timezone.utc),
+    )
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import datetime as dt
 import uuid
-from typing import Optional
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, AsyncIterator, Optional
 
-from sqlalchemy import insert, select, update
+from sqlalchemy import insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import ProductORM
@@ -16,9 +17,20 @@ class ProductRepository:
     ) -> ProductORM:
         raise NotImplementedError
 
+    async def create_many(
+        self, session: AsyncSession, items: list[dict]
+    ) -> list[ProductORM]:
+        """Insert products (dicts with name/price/description); rows keep input order."""
+        raise NotImplementedError
+
     async def get(self, session: AsyncSession, product_id: str) -> Optional[ProductORM]:
         raise NotImplementedError
 
+    async def get_many(
+        self, session: AsyncSession, product_ids: list[str]
+    ) -> list[ProductORM]:
+        raise NotImplementedError
+
     async def update(
         self,
         session: AsyncSession,
@@ -30,6 +42,32 @@ class ProductRepository:
     ) -> Optional[ProductORM]:
         raise NotImplementedError
 
+    def iter_by_updated_at(
+        self,
+        session: AsyncSession,
+        *,
+        after: tuple[dt.datetime, str] | None = None,
+        since: dt.datetime | None = None,
+        until: dt.datetime | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[ProductORM]:
+        """Yield products ordered by (updated_at, id), strictly after the `after`
+        keyset position and with since <= updated_at < until."""
+        raise NotImplementedError
+
+    def iter_by_price(
+        self,
+        session: AsyncSession,
+        *,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        after: tuple[float, str] | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[ProductORM]:
+        """Yield products with min_price <= price <= max_price ordered by
+        (price, id), strictly after the `after` keyset position."""
+        raise NotImplementedError
+
 
 class SqlAlchemyProductRepository(ProductRepository):
     async def create(
@@ -37,12 +75,39 @@ class SqlAlchemyProductRepository(ProductRepository):
     ) -> ProductORM:
         pid = f"p-{uuid.uuid4().hex[:8]}"
         now = dt.datetime.now(dt.timezone.utc)
-        stmt = insert(ProductORM).values(
-            id=pid, name=name, price=price, description=description, updated_at=now
+        # RETURNING gives back the row without a re-select; the commit is left
+        # to db.session_scope so the request has a single transaction boundary
+        stmt = (
+            insert(ProductORM)
+            .values(
+                id=pid, name=name, price=price, description=description, updated_at=now
+            )
+            .returning(ProductORM)
         )
-        await session.execute(stmt)
-        await session.commit()
-        return await self.get(session, pid)  # type: ignore
+        res = await session.execute(stmt)
+        return res.scalar_one()
+
+    async def create_many(
+        self, session: AsyncSession, items: list[dict]
+    ) -> list[ProductORM]:
+        if not items:
+            return []
+        now = dt.datetime.now(dt.timezone.utc)
+        values = [
+            {
+                "id": f"p-{uuid.uuid4().hex[:8]}",
+                "name": i["name"],
+                "price": i["price"],
+                "description": i.get("description"),
+                "updated_at": now,
+            }
+            for i in items
+        ]
+        # One multi-row INSERT ... VALUES (...), (...) RETURNING
+        stmt = insert(ProductORM).values(values).returning(ProductORM)
+        res = await session.execute(stmt)
+        by_id = {row.id: row for row in res.scalars().all()}
+        return [by_id[v["id"]] for v in values]
 
     async def get(self, session: AsyncSession, product_id: str) -> Optional[ProductORM]:
         stmt = select(ProductORM).where(ProductORM.id == product_id).limit(1)
@@ -50,6 +115,15 @@ class SqlAlchemyProductRepository(ProductRepository):
         row = res.scalar_one_or_none()
         return row
 
+    async def get_many(
+        self, session: AsyncSession, product_ids: list[str]
+    ) -> list[ProductORM]:
+        if not product_ids:
+            return []
+        stmt = select(ProductORM).where(ProductORM.id.in_(product_ids))
+        res = await session.execute(stmt)
+        return list(res.scalars().all())
+
     async def update(
         self,
         session: AsyncSession,
@@ -70,20 +144,183 @@ class SqlAlchemyProductRepository(ProductRepository):
         if len(updates) == 1:  # Only updated_at was set
             return await self.get(session, product_id)
 
-        stmt = update(ProductORM).where(ProductORM.id == product_id).values(**updates)
-        await session.execute(stmt)
-        await session.commit()
-        return await self.get(session, product_id)
+        stmt = (
+            update(ProductORM)
+            .where(ProductORM.id == product_id)
+            .values(**updates)
+            .returning(ProductORM)
+        )
+        res = await session.execute(stmt)
+        # No row back means no row matched: the caller turns that into a 404
+        return res.scalar_one_or_none()
+
+    async def iter_by_updated_at(
+        self,
+        session: AsyncSession,
+        *,
+        after: tuple[dt.datetime, str] | None = None,
+        since: dt.datetime | None = None,
+        until: dt.datetime | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[ProductORM]:
+        stmt = select(ProductORM).order_by(ProductORM.updated_at, ProductORM.id)
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(ProductORM.updated_at, ProductORM.id) > tuple_(*after)
+            )
+        if since is not None:
+            stmt = stmt.where(ProductORM.updated_at >= since)
+        if until is not None:
+            stmt = stmt.where(ProductORM.updated_at < until)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        # Server-side cursor: rows are fetched in batches, never all at once
+        res = await session.stream(stmt.execution_options(yield_per=500))
+        async for row in res.scalars():
+            yield row
+
+    async def iter_by_price(
+        self,
+        session: AsyncSession,
+        *,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        after: tuple[float, str] | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[ProductORM]:
+        stmt = select(ProductORM).order_by(ProductORM.price, ProductORM.id)
+        if after is not None:
+            stmt = stmt.where(tuple_(ProductORM.price, ProductORM.id) > tuple_(*after))
+        if min_price is not None:
+            stmt = stmt.where(ProductORM.price >= min_price)
+        if max_price is not None:
+            stmt = stmt.where(ProductORM.price <= max_price)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await session.stream(stmt.execution_options(yield_per=500))
+        async for row in res.scalars():
+            yield row
+
+
+class ProductRecord:
+    """Plain product row for the in-memory repository.
+
+    Has the attributes routes read from ProductORM, without the per-instance
+    SQLAlchemy state that makes ORM objects several times larger.
+    """
+
+    __slots__ = ("id", "name", "price", "description", "updated_at")
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        price: float,
+        description: str | None,
+        updated_at: dt.datetime,
+    ):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.description = description
+        self.updated_at = updated_at
+
+
+# Sorts after every product id, for inclusive upper bounds on (value, id) keys
+_MAX_ID = "\U0010ffff"
+
+
+class ProductStore:
+    """Products by id plus sorted (price, id) and (updated_at, id) indexes.
+
+    Range and keyset queries bisect into an index instead of scanning. Records
+    are shared with callers and only changed through update().
+    """
+
+    def __init__(self) -> None:
+        self._by_id: dict[str, ProductRecord] = {}
+        self._by_price: list[tuple[float, str]] = []
+        self._by_updated: list[tuple[dt.datetime, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, product_id: str) -> Optional[ProductRecord]:
+        return self._by_id.get(product_id)
 
+    def add(self, record: ProductRecord) -> None:
+        self._by_id[record.id] = record
+        insort(self._by_price, (record.price, record.id))
+        # New timestamps are normally the latest, so this is usually an append
+        insort(self._by_updated, (record.updated_at, record.id))
+
+    def update(self, product_id: str, **changes: Any) -> Optional[ProductRecord]:
+        record = self._by_id.get(product_id)
+        if record is None:
+            return None
+        _discard(self._by_price, (record.price, record.id))
+        _discard(self._by_updated, (record.updated_at, record.id))
+        for field, value in changes.items():
+            setattr(record, field, value)
+        insort(self._by_price, (record.price, record.id))
+        insort(self._by_updated, (record.updated_at, record.id))
+        return record
+
+    def by_updated_at(
+        self,
+        *,
+        after: tuple[dt.datetime, str] | None = None,
+        since: dt.datetime | None = None,
+        until: dt.datetime | None = None,
+        limit: int | None = None,
+    ) -> list[ProductRecord]:
+        """Records ordered by (updated_at, id), as ProductRepository.iter_by_updated_at."""
+        index = self._by_updated
+        start = bisect_right(index, after) if after is not None else 0
+        if since is not None:
+            start = max(start, bisect_left(index, (since, "")))
+        end = len(index) if until is None else bisect_left(index, (until, ""))
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self._by_id[pid] for _, pid in index[start:end]]
+
+    def by_price(
+        self,
+        *,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        after: tuple[float, str] | None = None,
+        limit: int | None = None,
+    ) -> list[ProductRecord]:
+        """Records with min_price <= price <= max_price, ordered by (price, id)."""
+        index = self._by_price
+        start = bisect_left(index, (min_price, "")) if min_price is not None else 0
+        if after is not None:
+            start = max(start, bisect_right(index, after))
+        stop = (
+            bisect_right(index, (max_price, _MAX_ID))
+            if max_price is not None
+            else len(index)
+        )
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return [self._by_id[pid] for _, pid in index[start:stop]]
 
-_MEM_ITEMS: dict[str, ProductORM] = {}
+
+def _discard(index: list, key: tuple) -> None:
+    i = bisect_left(index, key)
+    if i < len(index) and index[i] == key:
+        del index[i]
+
+
+_MEM_STORE = ProductStore()
 _MEM_COUNTER = {"n": 0}
 
 
 class InMemoryProductRepository(ProductRepository):
     def __init__(self):
         # Shared in-memory store across instances to persist within process
-        self._items = _MEM_ITEMS
+        self._store = _MEM_STORE
 
     async def create(
         self,
@@ -92,16 +329,37 @@ class InMemoryProductRepository(ProductRepository):
         name: str,
         price: float,
         description: str | None,
-    ) -> ProductORM:
+    ) -> ProductRecord:
         _MEM_COUNTER["n"] += 1
         pid = f"p-{_MEM_COUNTER['n']}"
         now = dt.datetime.now(dt.timezone.utc)
-        item = ProductORM(id=pid, name=name, price=price, description=description, updated_at=now)  # type: ignore
-        self._items[pid] = item
+        item = ProductRecord(pid, name, float(price), description, now)
+        self._store.add(item)
         return item
 
-    async def get(self, session: AsyncSession, product_id: str) -> Optional[ProductORM]:
-        return self._items.get(product_id)
+    async def create_many(
+        self, session: AsyncSession, items: list[dict]
+    ) -> list[ProductRecord]:
+        return [
+            await self.create(
+                session,
+                name=i["name"],
+                price=i["price"],
+                description=i.get("description"),
+            )
+            for i in items
+        ]
+
+    async def get(
+        self, session: AsyncSession, product_id: str
+    ) -> Optional[ProductRecord]:
+        return self._store.get(product_id)
+
+    async def get_many(
+        self, session: AsyncSession, product_ids: list[str]
+    ) -> list[ProductRecord]:
+        found = (self._store.get(pid) for pid in product_ids)
+        return [item for item in found if item is not None]
 
     async def update(
         self,
@@ -111,15 +369,41 @@ class InMemoryProductRepository(ProductRepository):
         name: Optional[str] = None,
         price: Optional[float] = None,
         description: Optional[str] = None,
-    ) -> Optional[ProductORM]:
-        item = self._items.get(product_id)
-        if not item:
-            return None
+    ) -> Optional[ProductRecord]:
+        changes: dict[str, Any] = {"updated_at": dt.datetime.now(dt.timezone.utc)}
         if name is not None:
-            item.name = name  # type: ignore
+            changes["name"] = name
         if price is not None:
-            item.price = price  # type: ignore
+            changes["price"] = float(price)
         if description is not None:
-            item.description = description  # type: ignore
-        item.updated_at = dt.datetime.now(dt.timezone.utc)  # type: ignore
-        return item
+            changes["description"] = description
+        return self._store.update(product_id, **changes)
+
+    async def iter_by_updated_at(
+        self,
+        session: AsyncSession,
+        *,
+        after: tuple[dt.datetime, str] | None = None,
+        since: dt.datetime | None = None,
+        until: dt.datetime | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[ProductRecord]:
+        # Snapshot of the page, so concurrent writes cannot shift it mid-stream
+        for item in self._store.by_updated_at(
+            after=after, since=since, until=until, limit=limit
+        ):
+            yield item
+
+    async def iter_by_price(
+        self,
+        session: AsyncSession,
+        *,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        after: tuple[float, str] | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[ProductRecord]:
+        for item in self._store.by_price(
+            min_price=min_price, max_price=max_price, after=after, limit=limit
+        ):
+            yield item
@@ -1,23 +1,77 @@
 from __future__ import annotations
 
-import asyncio
-from fastapi import APIRouter, HTTPException
+import base64
+import datetime as dt
+import time
+from typing import AsyncIterator, Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from contextlib import asynccontextmanager
 
-from . import db
-from .cache import cache_get, cache_set
+from . import db, outbox
+from .cache import (
+    cache_delete,
+    cache_get,
+    cache_get_many,
+    cache_get_version,
+    cache_get_versioned,
+    cache_set,
+    cache_set_many,
+    cache_set_raw,
+    publish_invalidation,
+    record_hot,
+    top_hot,
+)
 from .repositories import (
     InMemoryProductRepository,
     ProductRepository,
     SqlAlchemyProductRepository,
 )
-from .schemas import Product, ProductCreate, ProductUpdate, SearchResult
-from .search import search_products
-from .events_adapter import emit_product_updated
+from .schemas import (
+    Product,
+    ProductBatch,
+    ProductBatchRequest,
+    ProductCreate,
+    ProductUpdate,
+    SearchResult,
+    SuggestResult,
+)
+from .local_search import index_products
+from .search import search_products, suggest_products
+from .search_cache import (
+    cached_search,
+    invalidate_products,
+    normalize_query,
+    product_tags,
+    search_cache_key,
+)
+from .events_adapter import (
+    emit_product_updated,
+    emit_products_updated,
+    product_updated_records,
+)
+from .conditional import (
+    is_conditional,
+    not_modified,
+    not_modified_response,
+    validator_headers,
+    version_of,
+)
 from .config import get_settings
+from .singleflight import SingleFlight
+from .suggest import MAX_SUGGESTIONS, suggest_from_trie
+from .streaming import (
+    NDJSON_MEDIA_TYPE,
+    NDJSONStreamingResponse,
+    iter_lines,
+    ndjson_line,
+)
 
 
 router = APIRouter()
+_product_loads = SingleFlight("product")
 
 
 def get_repo() -> ProductRepository:
@@ -32,86 +86,578 @@ async def _null_session():
     yield None
 
 
+def _read_session(*, use_primary: bool = False):
+    if db.is_ready():
+        return db.read_session_scope(use_primary=use_primary)
+    return _null_session()
+
+
+async def _run_read(fn, *, use_primary: bool = False):
+    # Point reads go through db.run_read so a failed replica read is retried
+    if db.is_ready():
+        return await db.run_read(fn, use_primary=use_primary)
+    return await fn(None)
+
+
+_PRIMARY_COOKIE = "rw_primary_until"
+
+
+def _pin_to_primary(response: Response) -> None:
+    """Send this client's reads to the primary for the read-your-writes window."""
+    window = get_settings().read_your_writes_seconds
+    if not db.has_replicas() or window <= 0:
+        return
+    response.set_cookie(
+        _PRIMARY_COOKIE, str(int(time.time()) + window), max_age=window, httponly=True
+    )
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _product_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "price": float(row.price),
+        "description": row.description,
+        "updated_at": row.updated_at,
+    }
+
+
+def _product_body(product_dict: dict) -> bytes:
+    return Product(**product_dict).model_dump_json().encode()
+
+
+def _cache_version(product_dict: dict) -> int | None:
+    # updated_at in microseconds; cache writes carrying an older version than
+    # the stored entry are dropped, so a slow load cannot undo an update
+    return version_of(product_dict.get("updated_at"))
+
+
+async def _cache_product(product_dict: dict) -> None:
+    settings = get_settings()
+    key = f"product:{product_dict['id']}"
+    if settings.cache_raw_responses:
+        # Store the final response body so hits skip decode/validate/re-encode
+        await cache_set_raw(
+            key,
+            _product_body(product_dict),
+            ttl_seconds=settings.cache_ttl_seconds,
+            cache_name="product",
+            version=_cache_version(product_dict),
+        )
+        return
+    await cache_set(
+        key,
+        product_dict | {"updated_at": None},
+        ttl_seconds=settings.cache_ttl_seconds,
+        cache_name="product",
+        version=_cache_version(product_dict),
+    )
+
+
 @router.post("/products", status_code=201, response_model=Product)
-async def create_product(body: ProductCreate) -> Product:
+async def create_product(body: ProductCreate, response: Response) -> Product:
     repo = get_repo()
+    use_outbox = outbox.is_enabled()
     sess_cm = db.session_scope() if db.is_ready() else _null_session()  # type: ignore
     async with sess_cm as session:  # type: ignore
         created = await repo.create(
             session, name=body.name, price=body.price, description=body.description
         )
-    product_dict = {
-        "id": created.id,
-        "name": created.name,
-        "price": float(created.price),
-        "description": created.description,
-        "updated_at": created.updated_at,
-    }
+        product_dict = _product_dict(created)
+        if use_outbox:
+            await outbox.enqueue(session, product_updated_records([product_dict]))
     # Cache by id
+    await _cache_product(product_dict)
+    await cache_delete(f"neg:product:{created.id}", cache_name="product_negative")
+    await publish_invalidation(f"neg:product:{created.id}")
+    index_products([product_dict])
+    _pin_to_primary(response)
+    if use_outbox:
+        outbox.notify()
+    else:
+        await emit_product_updated(product_dict)
+    return Product(**product_dict)
+
+
+async def _cache_products(product_dicts: list[dict]) -> None:
+    """Write-through for several products in one pipelined round trip."""
     settings = get_settings()
-    await cache_set(
-        f"product:{created.id}",
-        product_dict | {"updated_at": None},
+    await cache_set_many(
+        {
+            f"product:{d['id']}": (
+                _product_body(d)
+                if settings.cache_raw_responses
+                else d | {"updated_at": None}
+            )
+            for d in product_dicts
+        },
         ttl_seconds=settings.cache_ttl_seconds,
         cache_name="product",
+        raw=settings.cache_raw_responses,
+        versions={
+            f"product:{d['id']}": v
+            for d in product_dicts
+            if (v := _cache_version(d)) is not None
+        },
     )
-    # Emit event asynchronously
-    asyncio.create_task(emit_product_updated(product_dict))
-    return Product(**product_dict)
 
 
-@router.get("/products/{id}", response_model=Product)
-async def get_product(id: str) -> Product:
-    cached = await cache_get(f"product:{id}", cache_name="product")
-    if cached:
-        return Product(**cached)
+@router.post("/products:bulk", response_class=NDJSONStreamingResponse)
+async def bulk_import_products(request: Request) -> NDJSONStreamingResponse:
+    """Import NDJSON ProductCreate lines; streams one result line per input line."""
+    response = NDJSONStreamingResponse(_bulk_import(request.stream()))
+    _pin_to_primary(response)
+    return response
+
 
+async def _bulk_import(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    settings = get_settings()
+    pending: list[tuple[int, ProductCreate]] = []
+    line_no = 0
+    try:
+        async for raw in iter_lines(
+            chunks, max_line_bytes=settings.bulk_max_line_bytes
+        ):
+            line_no += 1
+            if not raw.strip():
+                continue
+            try:
+                item = ProductCreate.model_validate_json(raw)
+            except ValidationError as e:
+                yield ndjson_line(
+                    {"line": line_no, "status": "error", "error": _errors_text(e)}
+                )
+                continue
+            pending.append((line_no, item))
+            if len(pending) >= settings.bulk_chunk_size:
+                yield await _import_chunk(pending)
+                pending = []
+    except ValueError as e:
+        yield ndjson_line({"line": line_no + 1, "status": "error", "error": str(e)})
+    if pending:
+        yield await _import_chunk(pending)
+
+
+async def _import_chunk(pending: list[tuple[int, ProductCreate]]) -> bytes:
     repo = get_repo()
+    use_outbox = outbox.is_enabled()
     sess_cm = db.session_scope() if db.is_ready() else _null_session()  # type: ignore
-    async with sess_cm as session:  # type: ignore
-        got = await repo.get(session, id)
-    if not got:
-        raise HTTPException(status_code=404, detail="Product not found")
-    product_dict = {
-        "id": got.id,
-        "name": got.name,
-        "price": float(got.price),
-        "description": got.description,
-        "updated_at": got.updated_at,
-    }
+    try:
+        async with sess_cm as session:  # type: ignore
+            rows = await repo.create_many(
+                session, [item.model_dump() for _, item in pending]
+            )
+            product_dicts = [_product_dict(row) for row in rows]
+            if use_outbox:
+                await outbox.enqueue(session, product_updated_records(product_dicts))
+    except Exception:
+        return b"".join(
+            ndjson_line({"line": n, "status": "error", "error": "insert failed"})
+            for n, _ in pending
+        )
+    await _cache_products(product_dicts)
+    index_products(product_dicts)
+    if use_outbox:
+        outbox.notify()
+    else:
+        await emit_products_updated(product_dicts)
+    return b"".join(
+        ndjson_line({"line": n, "status": "created", "id": d["id"]})
+        for (n, _), d in zip(pending, product_dicts)
+    )
+
+
+def _errors_text(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'body'}: {err['msg']}"
+        for err in e.errors()
+    )
+
+
+@router.get("/products", response_model=None)
+async def get_products(
+    request: Request,
+    ids: str | None = None,
+    after: str | None = None,
+    limit: int | None = Query(None, ge=1),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+) -> ProductBatch | StreamingResponse:
+    """Batch lookup with `ids`; otherwise a keyset-paginated NDJSON listing.
+
+    With `min_price` and/or `max_price` the listing is the price range ordered
+    by (price, id), served from the ix_products_price_id index.
+    """
+    if ids is not None:
+        return await _get_products_batch(
+            ids.split(","), use_primary=_pinned_to_primary(request)
+        )
+    limit = _page_limit(limit)
+    if min_price is not None or max_price is not None:
+        return _stream_products_by_price(
+            after=_decode_price_after(after),
+            min_price=min_price,
+            max_price=max_price,
+            limit=limit,
+        )
+    return _stream_products(after=_decode_after(after), limit=limit)
+
+
+@router.get("/products/changes", response_model=None)
+async def product_changes(
+    since: dt.datetime,
+    after: str | None = None,
+    limit: int | None = Query(None, ge=1),
+) -> StreamingResponse:
+    """NDJSON delta feed of products with updated_at >= `since`.
+
+    Best-effort: rows are ordered by the app-assigned updated_at, not by commit.
+    Rows newer than the settle window are held back until a later poll, so a
+    transaction that commits late is still seen unless it outlasts the window.
+    """
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=dt.timezone.utc)
+    limit = _page_limit(limit)
+    settle = get_settings().changes_settle_seconds
+    until = (
+        dt.datetime.now(dt.timezone.utc) - dt.timedelta(seconds=settle)
+        if settle > 0
+        else None
+    )
+    return _stream_products(
+        after=_decode_after(after), since=since, until=until, limit=limit
+    )
+
+
+def _page_limit(limit: int | None) -> int:
     settings = get_settings()
-    await cache_set(
-        f"product:{id}",
-        product_dict | {"updated_at": None},
-        ttl_seconds=settings.cache_ttl_seconds,
-        cache_name="product",
+    return max(1, min(limit or settings.list_page_size, settings.list_max_page_size))
+
+
+def _encode_after(updated_at: dt.datetime, id: str) -> str:
+    raw = f"{updated_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_after(cursor: str | None) -> tuple[dt.datetime, str] | None:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, id = raw.split("|", 1)
+        updated_at = dt.datetime.fromisoformat(ts)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Malformed cursor")
+    return updated_at, id
+
+
+def _encode_price_after(price: float, id: str) -> str:
+    raw = f"{price}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_price_after(cursor: str | None) -> tuple[float, str] | None:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        price, id = raw.split("|", 1)
+        return float(price), id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Malformed cursor")
+
+
+def _stream_products(
+    *,
+    after: tuple[dt.datetime, str] | None,
+    since: dt.datetime | None = None,
+    until: dt.datetime | None = None,
+    limit: int,
+) -> StreamingResponse:
+    async def lines() -> AsyncIterator[bytes]:
+        repo = get_repo()
+        sess_cm = _read_session()
+        n = 0
+        last = None
+        async with sess_cm as session:  # type: ignore
+            async for row in repo.iter_by_updated_at(
+                session, after=after, since=since, until=until, limit=limit
+            ):
+                n += 1
+                last = row
+                yield _product_body(_product_dict(row)) + b"\n"
+        # A full page may have more behind it: finish with the resume cursor
+        if n == limit and last is not None:
+            yield ndjson_line({"next_cursor": _encode_after(last.updated_at, last.id)})
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _stream_products_by_price(
+    *,
+    after: tuple[float, str] | None,
+    min_price: float | None,
+    max_price: float | None,
+    limit: int,
+) -> StreamingResponse:
+    async def lines() -> AsyncIterator[bytes]:
+        repo = get_repo()
+        sess_cm = _read_session()
+        n = 0
+        last = None
+        async with sess_cm as session:  # type: ignore
+            async for row in repo.iter_by_price(
+                session,
+                min_price=min_price,
+                max_price=max_price,
+                after=after,
+                limit=limit,
+            ):
+                n += 1
+                last = row
+                yield _product_body(_product_dict(row)) + b"\n"
+        if n == limit and last is not None:
+            yield ndjson_line({"next_cursor": _encode_price_after(last.price, last.id)})
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/products/{id}", response_model=Product)
+async def get_product(
+    id: str, request: Request, response: Response
+) -> Product | Response:
+    settings = get_settings()
+    result = await _get_product(id, request, response)
+    # Unknown ids raise above, so only products that exist are recorded
+    await record_hot(
+        "product",
+        id,
+        sample_rate=settings.hot_key_sample_rate,
+        keep=settings.hot_key_record_size,
     )
+    return result
+
+
+async def _get_product(
+    id: str, request: Request, response: Response
+) -> Product | Response:
+    settings = get_settings()
+    cache_control = settings.product_cache_control
+    key = f"product:{id}"
+    conditional = is_conditional(request)
+    if conditional:
+        # Revalidation only needs the cached version, not the entry itself
+        version = await cache_get_version(key)
+        if version is not None and not_modified(request, version):
+            return not_modified_response(version, cache_control)
+    if settings.cache_raw_responses:
+        body, version = await cache_get_versioned(key, raw=True, cache_name="product")
+        if body:
+            return Response(
+                content=body,
+                media_type="application/json",
+                headers=validator_headers(version, cache_control),
+            )
+    else:
+        cached, version = await cache_get_versioned(key, cache_name="product")
+        if cached:
+            response.headers.update(validator_headers(version, cache_control))
+            return Product(**cached)
+
+    # Concurrent misses for the same id share one DB load and one cache_set.
+    # Clients inside their read-your-writes window only share primary loads.
+    use_primary = _pinned_to_primary(request)
+    product_dict = await _product_loads.do(
+        f"{id}:primary" if use_primary else id,
+        lambda: _load_product(id, use_primary=use_primary),
+    )
+    if product_dict is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    version = _cache_version(product_dict)
+    if conditional and version is not None and not_modified(request, version):
+        return not_modified_response(version, cache_control)
+    response.headers.update(validator_headers(version, cache_control))
     return Product(**product_dict)
 
 
+async def hot_product_ids() -> list[str]:
+    """Warm-up candidates: the configured seed ids, then the hottest recorded."""
+    settings = get_settings()
+    hot = await top_hot("product", settings.warmup_top_n)
+    return [*settings.warmup_seed_ids, *hot]
+
+
+async def warm_products(ids: list[str]) -> int:
+    """Load one warm-up batch into the cache; returns how many ids were found."""
+    repo = get_repo()
+    rows = await _run_read(lambda session: repo.get_many(session, ids))
+    await _cache_products([_product_dict(row) for row in rows])
+    return len(rows)
+
+
+async def _load_product(id: str, *, use_primary: bool = False) -> dict | None:
+    settings = get_settings()
+    # Negative entries live under their own key so they never shadow a product
+    neg_key = f"neg:product:{id}"
+    if settings.negative_cache_ttl_seconds > 0 and await cache_get(
+        neg_key, cache_name="product_negative"
+    ):
+        return None
+    repo = get_repo()
+    got = await _run_read(
+        lambda session: repo.get(session, id), use_primary=use_primary
+    )
+    if not got:
+        if settings.negative_cache_ttl_seconds > 0:
+            await cache_set(
+                neg_key,
+                {"missing": True},
+                ttl_seconds=settings.negative_cache_ttl_seconds,
+                cache_name="product_negative",
+            )
+        return None
+    product_dict = _product_dict(got)
+    await _cache_product(product_dict)
+    return product_dict
+
+
+@router.post("/products:batchGet", response_model=ProductBatch)
+async def batch_get_products(
+    body: ProductBatchRequest, request: Request
+) -> ProductBatch:
+    return await _get_products_batch(body.ids, use_primary=_pinned_to_primary(request))
+
+
+async def _get_products_batch(
+    raw_ids: list[str], *, use_primary: bool = False
+) -> ProductBatch:
+    ids = list(dict.fromkeys(i.strip() for i in raw_ids if i.strip()))
+    settings = get_settings()
+    if not ids:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(ids) > settings.batch_max_ids:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.batch_max_ids} ids allowed"
+        )
+
+    # One MGET for all ids, then one IN (...) query for whatever missed
+    cached = await cache_get_many([f"product:{i}" for i in ids], cache_name="product")
+    found = {i: cached[f"product:{i}"] for i in ids if f"product:{i}" in cached}
+    misses = [i for i in ids if i not in found]
+    if misses:
+        repo = get_repo()
+        rows = await _run_read(
+            lambda session: repo.get_many(session, misses), use_primary=use_primary
+        )
+        product_dicts = [_product_dict(row) for row in rows]
+        found.update((d["id"], d) for d in product_dicts)
+        await _cache_products(product_dicts)
+    return ProductBatch(
+        results=[Product(**found[i]) for i in ids if i in found],
+        missing=[i for i in ids if i not in found],
+    )
+
+
 @router.get("/search", response_model=SearchResult)
-async def search(q: str) -> SearchResult:
-    # Simple cache for search queries
-    key = f"search:{q}"
-    cached = await cache_get(key, cache_name="search")
-    if cached and isinstance(cached.get("results"), list):
-        return SearchResult(**cached)
-
-    res = search_products(q)
-    payload = {"query": q, "results": res}
+async def search(
+    q: str,
+    size: int = Query(10, ge=1, le=100),
+    sort: Literal["relevance", "price_asc", "price_desc", "newest"] = "relevance",
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    cursor: str | None = None,
+) -> SearchResult:
     settings = get_settings()
-    await cache_set(
-        key,
-        payload,
-        ttl_seconds=settings.search_cache_ttl_seconds,
-        cache_name="search",
+    nq = normalize_query(q)
+    key = search_cache_key(
+        nq,
+        size=size,
+        sort=sort,
+        min_price=min_price,
+        max_price=max_price,
+        cursor=cursor,
+    )
+
+    async def _load() -> dict:
+        res, next_cursor = await search_products(
+            nq,
+            size=size,
+            sort=sort,
+            min_price=min_price,
+            max_price=max_price,
+            cursor=cursor,
+        )
+        return {"query": nq, "results": res, "next_cursor": next_cursor}
+
+    try:
+        payload = await cached_search(
+            key,
+            _load,
+            soft_ttl_seconds=settings.search_cache_ttl_seconds,
+            hard_ttl_seconds=settings.search_cache_hard_ttl_seconds,
+            tags=product_tags,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Cached entries are shared across spellings of the query; echo the caller's
+    return SearchResult(**payload | {"query": q})
+
+
+@router.get("/search/suggest", response_model=SuggestResult)
+async def suggest(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    size: int = Query(5, ge=1, le=MAX_SUGGESTIONS),
+) -> SuggestResult:
+    # Common prefixes are answered from the in-process trie
+    found = suggest_from_trie(prefix, size)
+    if found is not None:
+        return SuggestResult(prefix=prefix, suggestions=found)
+    settings = get_settings()
+    nq = normalize_query(prefix)
+
+    async def _load() -> dict:
+        return {"suggestions": await suggest_products(nq, size=size)}
+
+    payload = await cached_search(
+        search_cache_key(nq, kind="suggest", size=size),
+        _load,
+        soft_ttl_seconds=settings.search_cache_ttl_seconds,
+        hard_ttl_seconds=settings.search_cache_hard_ttl_seconds,
     )
-    return SearchResult(**payload)
+    return SuggestResult(prefix=prefix, suggestions=payload["suggestions"])
+
+
+async def iter_all_products() -> AsyncIterator[dict]:
+    """Every product, for seeding the in-process search index."""
+    repo = get_repo()
+    async with _read_session() as session:  # type: ignore
+        async for row in repo.iter_by_updated_at(session):
+            yield _product_dict(row)
+
+
+async def suggest_candidates() -> list[tuple[str, float]]:
+    """Names of the hottest products for the suggest trie, scored by rank."""
+    settings = get_settings()
+    ids = await top_hot("product", settings.suggest_trie_size)
+    if not ids:
+        return []
+    repo = get_repo()
+    rows = await _run_read(lambda session: repo.get_many(session, ids))
+    rank = {id: len(ids) - i for i, id in enumerate(ids)}
+    return [(row.name, float(rank.get(row.id, 0))) for row in rows]
 
 
 @router.put("/products/{id}", response_model=Product)
-async def update_product(id: str, body: ProductUpdate) -> Product:
+async def update_product(id: str, body: ProductUpdate, response: Response) -> Product:
     repo = get_repo()
+    use_outbox = outbox.is_enabled()
     sess_cm = db.session_scope() if db.is_ready() else _null_session()  # type: ignore
     async with sess_cm as session:  # type: ignore
         updated = await repo.update(
@@ -121,23 +667,22 @@ async def update_product(id: str, body: ProductUpdate) -> Product:
             price=body.price,
             description=body.description,
         )
-    if not updated:
-        raise HTTPException(status_code=404, detail="Product not found")
+        if not updated:
+            raise HTTPException(status_code=404, detail="Product not found")
+        product_dict = _product_dict(updated)
+        if use_outbox:
+            await outbox.enqueue(session, product_updated_records([product_dict]))
 
-    product_dict = {
-        "id": updated.id,
-        "name": updated.name,
-        "price": float(updated.price),
-        "description": updated.description,
-        "updated_at": updated.updated_at,
-    }
     # Invalidate cache and set fresh value
-    settings = get_settings()
-    await cache_set(
-        f"product:{id}",
-        product_dict | {"updated_at": None},
-        ttl_seconds=settings.cache_ttl_seconds,
-        cache_name="product",
+    await _cache_product(product_dict)
+    await publish_invalidation(f"product:{id}")
+    await invalidate_products(
+        [id], delay_seconds=get_settings().search_invalidation_delay_seconds
     )
-    asyncio.create_task(emit_product_updated(product_dict))
+    index_products([product_dict])
+    _pin_to_primary(response)
+    if use_outbox:
+        outbox.notify()
+    else:
+        await emit_product_updated(product_dict)
     return Product(**product_dict)
@@ -27,3 +27,18 @@ class ProductUpdate(BaseModel):
 class SearchResult(BaseModel):
     query: str
     results: list[Product]
+    next_cursor: str | None = None
+
+
+class SuggestResult(BaseModel):
+    prefix: str
+    suggestions: list[str]
+
+
+class ProductBatchRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1)
+
+
+class ProductBatch(BaseModel):
+    results: list[Product]
+    missing: list[str]
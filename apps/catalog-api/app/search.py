@@ -1,40 +1,175 @@
 from __future__ import annotations
 
-import os
+import base64
+import json
 from typing import Any, List
 
+from .local_search import get_local_index
+
+try:
+    from opensearchpy import AsyncOpenSearch
+except Exception:  # pragma: no cover
+    AsyncOpenSearch = None  # type: ignore
+
 try:
-    from opensearchpy import OpenSearch
+    from prometheus_client import Counter
 except Exception:  # pragma: no cover
-    OpenSearch = None  # type: ignore
+    Counter = None  # type: ignore
 
+_fallback_counter = (
+    Counter(
+        "catalog_search_fallback_total",
+        "Searches answered by the in-process index instead of OpenSearch",
+        ["reason"],
+    )
+    if Counter
+    else None
+)
 
-def get_search_client():
+# Long-lived client (one aiohttp connection pool per process), created in the
+# app lifespan so it binds to the running event loop.
+_client = None
+
+
+def init_search_client(
+    url: str | None,
+    *,
+    timeout_seconds: float = 2.0,
+    max_retries: int = 2,
+    pool_maxsize: int = 20,
+) -> None:
+    global _client
+    if not url or AsyncOpenSearch is None:
+        _client = None
+        return
     try:
-        url = os.getenv("OPENSEARCH_URL", "http://localhost:9200")
-        if OpenSearch is None:
-            return None
-        return OpenSearch(hosts=[url])
+        _client = AsyncOpenSearch(
+            hosts=[url],
+            timeout=timeout_seconds,
+            max_retries=max_retries,
+            retry_on_timeout=True,
+            maxsize=pool_maxsize,
+        )
     except Exception:
-        return None
+        _client = None
 
 
-def search_products(q: str) -> list[dict[str, Any]]:
-    client = get_search_client()
-    if not client or not q:
-        return []
+async def close_search_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is None:
+        return
     try:
-        res = client.search(
-            index="products",
-            body={
-                "size": 10,
-                "query": {
+        await client.close()
+    except Exception:
+        pass
+
+
+def get_search_client():
+    return _client
+
+
+# Sort options exposed on /search. Each ends with a unique tiebreaker so that
+# search_after cursors are stable across pages.
+SORTS: dict[str, list[dict[str, Any]]] = {
+    "relevance": [{"_score": "desc"}, {"product_id": "asc"}],
+    "price_asc": [{"price": "asc"}, {"product_id": "asc"}],
+    "price_desc": [{"price": "desc"}, {"product_id": "asc"}],
+    "newest": [{"updated_at": "desc"}, {"product_id": "asc"}],
+}
+
+
+def encode_cursor(sort: str, search_after: list[Any]) -> str:
+    raw = json.dumps({"s": sort, "a": search_after}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> list[Any]:
+    """Return the search_after values in `cursor`; ValueError if it is unusable."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = data["a"]
+        cursor_sort = data["s"]
+    except Exception as e:
+        raise ValueError("Malformed cursor") from e
+    if cursor_sort != sort or not isinstance(values, list):
+        raise ValueError("Cursor does not match sort order")
+    return values
+
+
+def build_query(
+    q: str,
+    *,
+    size: int = 10,
+    sort: str = "relevance",
+    min_price: float | None = None,
+    max_price: float | None = None,
+    search_after: list[Any] | None = None,
+) -> dict[str, Any]:
+    filters: list[dict[str, Any]] = []
+    price_range: dict[str, float] = {}
+    if min_price is not None:
+        price_range["gte"] = min_price
+    if max_price is not None:
+        price_range["lte"] = max_price
+    if price_range:
+        # Filter context: not scored, and cacheable by OpenSearch
+        filters.append({"range": {"price": price_range}})
+    body: dict[str, Any] = {
+        "size": size,
+        "track_total_hits": False,
+        "sort": SORTS[sort],
+        "query": {
+            "bool": {
+                "must": {
                     "multi_match": {
                         "query": q,
                         "fields": ["name^2", "description"],
                     }
                 },
-            },
+                "filter": filters,
+            }
+        },
+    }
+    if search_after:
+        body["search_after"] = search_after
+    return body
+
+
+async def search_products(
+    q: str,
+    *,
+    size: int = 10,
+    sort: str = "relevance",
+    min_price: float | None = None,
+    max_price: float | None = None,
+    cursor: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Return one page of hits and the cursor for the next page (None at the end).
+
+    Without OpenSearch, or when it fails, the in-process index answers if enabled.
+    Raises ValueError for an invalid cursor.
+    """
+    search_after = decode_cursor(cursor, sort) if cursor else None
+    if not q:
+        return [], None
+    client = get_search_client()
+    if not client:
+        return _local_search(
+            "unconfigured", q, size, sort, min_price, max_price, search_after
+        )
+    try:
+        res = await client.search(
+            index="products",
+            body=build_query(
+                q,
+                size=size,
+                sort=sort,
+                min_price=min_price,
+                max_price=max_price,
+                search_after=search_after,
+            ),
         )
         hits = res.get("hits", {}).get("hits", [])
         items: List[dict[str, Any]] = []
@@ -48,16 +183,73 @@ def search_products(q: str) -> list[dict[str, Any]]:
                     "description": src.get("description"),
                 }
             )
-        return items
+        next_cursor = None
+        if len(hits) == size and hits[-1].get("sort"):
+            next_cursor = encode_cursor(sort, hits[-1]["sort"])
+        return items, next_cursor
+    except Exception:
+        return _local_search("error", q, size, sort, min_price, max_price, search_after)
+
+
+def _local_search(
+    reason: str,
+    q: str,
+    size: int,
+    sort: str,
+    min_price: float | None,
+    max_price: float | None,
+    search_after: list[Any] | None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    index = get_local_index()
+    if index is None:
+        return [], None
+    if _fallback_counter:
+        _fallback_counter.labels(reason).inc()
+    items, last = index.search(
+        q,
+        size=size,
+        sort=sort,
+        min_price=min_price,
+        max_price=max_price,
+        search_after=search_after,
+    )
+    return items, encode_cursor(sort, last) if last else None
+
+
+def build_suggest_query(prefix: str, *, size: int = 10) -> dict[str, Any]:
+    # name.suggest is edge-n-grammed at index time, so this is a plain term lookup
+    return {
+        "size": size,
+        "track_total_hits": False,
+        "_source": ["name"],
+        "query": {"match": {"name.suggest": {"query": prefix, "operator": "and"}}},
+    }
+
+
+async def suggest_products(prefix: str, *, size: int = 10) -> list[str]:
+    """Product names matching `prefix` at a word start, best match first."""
+    client = get_search_client()
+    if not client or not prefix:
+        return []
+    try:
+        # Over-fetch a little: several products can share a name
+        res = await client.search(
+            index="products", body=build_suggest_query(prefix, size=size * 2)
+        )
+        names = (
+            h.get("_source", {}).get("name")
+            for h in res.get("hits", {}).get("hits", [])
+        )
+        return list(dict.fromkeys(n for n in names if n))[:size]
     except Exception:
         return []
 
 
-def ping() -> bool:
+async def ping() -> bool:
     client = get_search_client()
     try:
         if not client:
             return False
-        return bool(client.ping())
+        return bool(await client.ping())
     except Exception:
         return False
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+import unicodedata
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlencode
+
+from .cache import cache_get, cache_invalidate_tags, cache_set, cache_tag
+from .singleflight import SingleFlight
+
+try:
+    from prometheus_client import Counter
+except Exception:  # pragma: no cover
+    Counter = None  # type: ignore
+
+_lookup_counter = (
+    Counter(
+        "catalog_search_cache_lookups_total",
+        "Search cache lookups by result",
+        ["result"],
+    )
+    if Counter
+    else None
+)
+_refresh_counter = (
+    Counter(
+        "catalog_search_cache_refreshes_total",
+        "Search cache refreshes against OpenSearch",
+        ["trigger"],
+    )
+    if Counter
+    else None
+)
+
+_invalidation_counter = (
+    Counter(
+        "catalog_search_cache_invalidations_total",
+        "Search cache entries evicted because a product in them changed",
+        ["pass"],
+    )
+    if Counter
+    else None
+)
+_untagged_counter = (
+    Counter(
+        "catalog_search_cache_untagged_total",
+        "Search results cached with the soft TTL only because a tag was full",
+    )
+    if Counter
+    else None
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_loads = SingleFlight("search")
+# Background refresh tasks, held so they are not garbage collected mid-flight
+_background: set[asyncio.Task] = set()
+
+
+def normalize_query(q: str) -> str:
+    """Fold case, unicode compatibility forms and whitespace runs."""
+    q = unicodedata.normalize("NFKC", q).casefold()
+    return _WHITESPACE.sub(" ", q).strip()
+
+
+def product_tags(payload: dict[str, Any]) -> list[str]:
+    """Invalidation tags of a search payload: the products it shows."""
+    return [f"product:{r['id']}" for r in payload.get("results") or () if r.get("id")]
+
+
+def search_cache_key(q: str, **params: Any) -> str:
+    """Canonical cache key: normalized query plus non-None params, sorted."""
+    items = sorted((k, str(v)) for k, v in params.items() if v is not None)
+    return f"search:{urlencode([('q', normalize_query(q)), *items])}"
+
+
+async def cached_search(
+    key: str,
+    loader: Callable[[], Awaitable[dict[str, Any]]],
+    *,
+    soft_ttl_seconds: int,
+    hard_ttl_seconds: int,
+    tags: Optional[Callable[[dict[str, Any]], list[str]]] = None,
+) -> dict[str, Any]:
+    """Stale-while-revalidate lookup.
+
+    Within the soft TTL the cached payload is returned as-is. Between the soft
+    and hard TTL the stale payload is returned immediately and one background
+    refresh is started. Past the hard TTL Redis has expired the entry and the
+    caller loads it (concurrent misses are coalesced).
+
+    With `tags`, each stored payload is recorded under its tags, so
+    invalidate_products can evict it before either TTL.
+    """
+    entry = await cache_get(key, cache_name="search")
+    if entry and isinstance(entry.get("payload"), dict):
+        if entry.get("fresh_until", 0) > time.time():
+            _count("hit")
+            return entry["payload"]
+        _count("stale")
+        if key not in _loads:
+            task = asyncio.create_task(
+                _loads.do(
+                    key,
+                    lambda: _refresh(
+                        key, loader, soft_ttl_seconds, hard_ttl_seconds, "stale", tags
+                    ),
+                )
+            )
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+        return entry["payload"]
+    _count("miss")
+    return await _loads.do(
+        key,
+        lambda: _refresh(key, loader, soft_ttl_seconds, hard_ttl_seconds, "miss", tags),
+    )
+
+
+async def _refresh(
+    key: str,
+    loader: Callable[[], Awaitable[dict[str, Any]]],
+    soft_ttl_seconds: int,
+    hard_ttl_seconds: int,
+    trigger: str,
+    tags: Optional[Callable[[dict[str, Any]], list[str]]] = None,
+) -> dict[str, Any]:
+    if _refresh_counter:
+        _refresh_counter.labels(trigger).inc()
+    payload = await loader()
+    entry = {"payload": payload, "fresh_until": time.time() + soft_ttl_seconds}
+    ttl = max(soft_ttl_seconds, hard_ttl_seconds)
+    await cache_set(key, entry, ttl_seconds=ttl, cache_name="search")
+    # Tagged after the write: an invalidation racing in between is caught by
+    # the delayed pass in invalidate_products
+    if tags is not None and not await cache_tag(key, tags(payload), ttl):
+        if _untagged_counter:
+            _untagged_counter.inc()
+        await cache_set(
+            key, entry, ttl_seconds=max(1, soft_ttl_seconds), cache_name="search"
+        )
+    return payload
+
+
+async def invalidate_products(ids: list[str], *, delay_seconds: float = 0) -> int:
+    """Evict cached searches showing any of `ids`; returns how many.
+
+    With `delay_seconds`, a second pass runs after that long in the
+    background. OpenSearch only reflects a change once the indexer has
+    consumed its event, so a search refilled in between still holds the old
+    row; the second pass evicts it.
+    """
+    tags = [f"product:{i}" for i in ids]
+    evicted = await cache_invalidate_tags(tags)
+    if _invalidation_counter:
+        _invalidation_counter.labels("immediate").inc(evicted)
+    if delay_seconds > 0:
+
+        async def later() -> None:
+            await asyncio.sleep(delay_seconds)
+            n = await cache_invalidate_tags(tags)
+            if _invalidation_counter:
+                _invalidation_counter.labels("delayed").inc(n)
+
+        task = asyncio.create_task(later())
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+    return evicted
+
+
+def _count(result: str) -> None:
+    if _lookup_counter:
+        _lookup_counter.labels(result).inc()
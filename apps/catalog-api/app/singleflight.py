@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+
+try:
+    from prometheus_client import Counter
+except Exception:  # pragma: no cover
+    Counter = None  # type: ignore
+
+T = TypeVar("T")
+
+_coalesced_counter = (
+    Counter(
+        "catalog_singleflight_coalesced_total",
+        "Callers that joined an in-flight load instead of starting their own",
+        ["group"],
+    )
+    if Counter
+    else None
+)
+
+
+class SingleFlight:
+    """De-duplicates concurrent loads of the same key.
+
+    The first caller for a key runs the loader; callers arriving while it is in
+    flight await the same result. The loader runs as its own task, so a caller
+    being cancelled (e.g. client disconnect) does not cancel the shared load.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self.coalesced = 0
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+
+    async def do(self, key: str, loader: Callable[[], Awaitable[T]]) -> T:
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.coalesced += 1
+            if _coalesced_counter:
+                _coalesced_counter.labels(self.group).inc()
+        else:
+            fut = asyncio.ensure_future(loader())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _f, k=key: self._inflight.pop(k, None))
+        return await asyncio.shield(fut)
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """StreamingResponse that can be produced while the request body is read.
+
+    Starlette's StreamingResponse listens on `receive` for disconnects while it
+    streams, which would swallow request body chunks that the body iterator is
+    still consuming. This variant only sends; a client disconnect surfaces as
+    an error from the request stream or from `send`.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], *, max_line_bytes: int
+) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without buffering more than one line."""
+    buf = b""
+    async for chunk in chunks:
+        buf += chunk
+        if b"\n" in chunk:
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                yield line
+        if len(buf) > max_line_bytes:
+            raise ValueError(f"Line exceeds {max_line_bytes} bytes")
+    if buf:
+        yield buf
+
+
+def ndjson_line(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), default=str).encode() + b"\n"
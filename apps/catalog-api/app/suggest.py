@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Iterable, Optional
+
+from .search_cache import normalize_query
+
+try:
+    from prometheus_client import Counter
+except Exception:  # pragma: no cover
+    Counter = None  # type: ignore
+
+MAX_SUGGESTIONS = 10
+# Prefixes longer than this are not indexed in-process; they are rare and
+# narrow enough for OpenSearch to answer quickly
+MAX_PREFIX_LEN = 12
+
+_source_counter = (
+    Counter(
+        "catalog_suggest_requests_total",
+        "Autocomplete requests by where they were answered",
+        ["source"],
+    )
+    if Counter
+    else None
+)
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.top: list[str] = []
+
+
+class PrefixTrie:
+    """Immutable prefix index over product names.
+
+    Every node stores its best MAX_SUGGESTIONS completions, so a lookup is a
+    walk of len(prefix) nodes. Names are indexed from each word start, so
+    "sho" completes "Running Shoes".
+    """
+
+    def __init__(self, names: Iterable[tuple[str, float]]):
+        self._root = _Node()
+        self.size = 0
+        # Highest score first: the first distinct names to reach a node are its best
+        for name, _ in sorted(names, key=lambda ns: ns[1], reverse=True):
+            self.size += 1
+            words = normalize_query(name).split(" ")
+            for i in range(len(words)):
+                self._insert(" ".join(words[i:])[:MAX_PREFIX_LEN], name)
+
+    def _insert(self, key: str, name: str) -> None:
+        node = self._root
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+            if len(node.top) < MAX_SUGGESTIONS and name not in node.top:
+                node.top.append(name)
+
+    def lookup(self, prefix: str, size: int) -> Optional[list[str]]:
+        """Completions for `prefix`, or None when the trie cannot fill `size`."""
+        key = normalize_query(prefix)
+        if not key or len(key) > MAX_PREFIX_LEN:
+            return None
+        node = self._root
+        for ch in key:
+            node = node.children.get(ch)  # type: ignore[assignment]
+            if node is None:
+                return None
+        if len(node.top) < size:
+            return None
+        return node.top[:size]
+
+
+_trie: Optional[PrefixTrie] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def suggest_from_trie(prefix: str, size: int) -> Optional[list[str]]:
+    found = _trie.lookup(prefix, size) if _trie is not None else None
+    if _source_counter:
+        _source_counter.labels("trie" if found is not None else "opensearch").inc()
+    return found
+
+
+async def _refresh_loop(
+    loader: Callable[[], Awaitable[list[tuple[str, float]]]], interval_seconds: float
+) -> None:
+    global _trie
+    while True:
+        try:
+            # Built off to the side and swapped in, so lookups never see a partial trie
+            _trie = PrefixTrie(await loader())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+        await asyncio.sleep(interval_seconds)
+
+
+def start_trie_refresh(
+    loader: Callable[[], Awaitable[list[tuple[str, float]]]], interval_seconds: float
+) -> None:
+    global _refresh_task
+    if _refresh_task is not None:
+        return
+    _refresh_task = asyncio.create_task(_refresh_loop(loader, interval_seconds))
+
+
+async def stop_trie_refresh() -> None:
+    global _refresh_task
+    task, _refresh_task = _refresh_task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+from time import monotonic
+from typing import Awaitable, Callable, Optional
+
+try:
+    from prometheus_client import Counter, Gauge
+except Exception:  # pragma: no cover
+    Counter = None  # type: ignore
+    Gauge = None  # type: ignore
+
+_loaded_counter = (
+    Counter("catalog_warmup_keys_loaded_total", "Keys preloaded by cache warm-up")
+    if Counter
+    else None
+)
+_pending_gauge = (
+    Gauge("catalog_warmup_keys_pending", "Keys still queued for cache warm-up")
+    if Gauge
+    else None
+)
+
+# idle -> running -> done | timed_out | failed; only "running" holds readiness
+_state: dict = {"status": "idle", "total": 0, "loaded": 0, "elapsed_seconds": 0.0}
+_task: Optional[asyncio.Task] = None
+
+
+def progress() -> dict:
+    return dict(_state)
+
+
+def in_progress() -> bool:
+    return _state["status"] == "running"
+
+
+async def run_warmup(
+    ids: list[str],
+    load_batch: Callable[[list[str]], Awaitable[int]],
+    *,
+    batch_size: int,
+    concurrency: int,
+    deadline_seconds: float,
+) -> None:
+    """Preload `ids` in batches, at most `concurrency` batches at a time.
+
+    Whatever is not loaded by the deadline is left to fill on demand.
+    """
+    ids = list(dict.fromkeys(ids))
+    batches = [ids[i : i + batch_size] for i in range(0, len(ids), batch_size)]
+    _state.update(status="running", total=len(ids), loaded=0, elapsed_seconds=0.0)
+    if _pending_gauge:
+        _pending_gauge.set(len(ids))
+    start = monotonic()
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(batch: list[str]) -> None:
+        async with sem:
+            n = await load_batch(batch)
+        _state["loaded"] += n
+        if _loaded_counter:
+            _loaded_counter.inc(n)
+        if _pending_gauge:
+            _pending_gauge.dec(len(batch))
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(one(b) for b in batches)), timeout=deadline_seconds
+        )
+        _state["status"] = "done"
+    except asyncio.TimeoutError:
+        _state["status"] = "timed_out"
+    except asyncio.CancelledError:
+        _state["status"] = "failed"
+        raise
+    except Exception:
+        _state["status"] = "failed"
+    finally:
+        _state["elapsed_seconds"] = round(monotonic() - start, 3)
+        if _pending_gauge:
+            _pending_gauge.set(0)
+
+
+def start_warmup(
+    resolve_ids: Callable[[], Awaitable[list[str]]],
+    load_batch: Callable[[list[str]], Awaitable[int]],
+    *,
+    batch_size: int,
+    concurrency: int,
+    deadline_seconds: float,
+) -> None:
+    """Run the warm-up in the background; /readyz reports it until it ends."""
+    global _task
+    if _task is not None:
+        return
+    _state["status"] = "running"
+
+    async def run() -> None:
+        start = monotonic()
+        try:
+            ids = await asyncio.wait_for(resolve_ids(), timeout=deadline_seconds)
+        except Exception:
+            _state["status"] = "failed"
+            return
+        await run_warmup(
+            ids,
+            load_batch,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            deadline_seconds=max(0.0, deadline_seconds - (monotonic() - start)),
+        )
+
+    _task = asyncio.create_task(run())
+
+
+async def stop_warmup() -> None:
+    global _task
+    task, _task = _task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
@@ -0,0 +1,68 @@
+"""Latency of a GET /products/{id} cache hit: validated path vs raw-bytes path.
+
+Drives the route handler directly with the L1 cache enabled, so every call is
+a hit and network/ASGI overhead is left out. The validated path includes the
+response serialization FastAPI performs for a response_model.
+
+Run from apps/catalog-api:  python benchmarks/bench_cache_hit.py [--calls 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+from pathlib import Path
+from time import perf_counter
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from fastapi import Request, Response  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app import cache, routes  # noqa: E402
+from app.config import Settings  # noqa: E402
+from app.schemas import ProductCreate  # noqa: E402
+
+
+async def run(raw: bool, n_calls: int, description_len: int) -> list[float]:
+    settings = Settings(cache_raw_responses=raw)
+    routes.get_settings = lambda: settings
+    cache.init_local_cache(1000, 3600)
+    body = ProductCreate(name="Bench", price=9.99, description="x" * description_len)
+    with contextlib.redirect_stdout(io.StringIO()):
+        created = await routes.create_product(body, Response())
+        await asyncio.sleep(0)  # let the event task print into the sink
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    samples = []
+    for _ in range(n_calls):
+        start = perf_counter()
+        result = await routes.get_product(created.id, request, Response())
+        if not isinstance(result, Response):
+            result = JSONResponse(jsonable_encoder(result))
+        assert result.body
+        samples.append(perf_counter() - start)
+    return sorted(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--description-len", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'p50 us':>10}{'p99 us':>10}")
+    for raw in (False, True):
+        s = asyncio.run(run(raw, args.calls, args.description_len))
+        p50, p99 = s[len(s) // 2], s[int(len(s) * 0.99)]
+        label = "raw" if raw else "validated"
+        print(f"{label:<12}{p50 * 1e6:>10.1f}{p99 * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Compare JSON and Avro event values: wire bytes and encode/decode time.
+
+ProductUpdated goes through events_adapter.encode_product_updated (the path
+routes and the outbox use), once per mode; OrderCreated uses the same codec
+on an orders-shaped payload. Decoding is what the indexer does per message.
+
+Run from apps/catalog-api:  python benchmarks/bench_event_codec.py [--rounds 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from timeit import timeit
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from app import events_adapter  # noqa: E402
+from app.event_codec import load_codec  # noqa: E402
+
+
+def make_product(description_words: int) -> dict:
+    return {
+        "id": "p-1a2b3c4d",
+        "name": "Trail Running Shoes",
+        "price": 89.99,
+        "description": " ".join(["lightweight breathable mesh"] * description_words),
+    }
+
+
+def make_order(n_items: int) -> dict:
+    return {
+        "event_id": "o-1a2b3c4d",
+        "occurred_at": "2025-10-18T12:00:00.123456+00:00",
+        "order_id": "o-1a2b3c4d",
+        "customer_id": "c-42",
+        "items": [
+            {"product_id": f"p-{i:08x}", "quantity": i % 5 + 1, "unit_price": 9.99}
+            for i in range(n_items)
+        ],
+        "total_amount": 1234.56,
+        "currency": "USD",
+        "status": "CREATED",
+        "created_at": "2025-10-18T12:00:00.123000+00:00",
+    }
+
+
+def report(label: str, raw: bytes, encode, decode, rounds: int) -> None:
+    enc = timeit(encode, number=rounds)
+    dec = timeit(decode, number=rounds)
+    print(
+        f"{label:<28}{len(raw):>8}"
+        f"{enc / rounds * 1e6:>12.2f}{dec / rounds * 1e6:>12.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--description-words", type=int, default=10)
+    parser.add_argument("--items", type=int, default=5)
+    args = parser.parse_args()
+    rounds = args.rounds
+
+    print(f"{rounds} rounds")
+    print(f"{'event / encoding':<28}{'bytes':>8}{'encode us':>12}{'decode us':>12}")
+    product = make_product(args.description_words)
+    for label, encoding, validate in (
+        ("ProductUpdated json", "json", False),
+        ("ProductUpdated json+validate", "json", True),
+        ("ProductUpdated avro", "avro", False),
+    ):
+        events_adapter.init_event_encoding(encoding, validate_avro=validate)
+        raw = events_adapter.encode_product_updated(product)
+        codec = events_adapter._codec
+        decode = (
+            (lambda: codec.decode(raw))  # noqa: E731
+            if encoding == "avro"
+            else (lambda: json.loads(raw))  # noqa: E731
+        )
+        report(
+            label,
+            raw,
+            lambda: events_adapter.encode_product_updated(product),
+            decode,
+            rounds,
+        )
+
+    order = make_order(args.items)
+    codec = load_codec("OrderCreated")
+    raw_json = json.dumps(order).encode("utf-8")
+    raw_avro = codec.encode(order)
+    assert codec.decode(raw_avro) == order
+    report(
+        "OrderCreated json",
+        raw_json,
+        lambda: json.dumps(order).encode("utf-8"),
+        lambda: json.loads(raw_json),
+        rounds,
+    )
+    report(
+        "OrderCreated avro",
+        raw_avro,
+        lambda: codec.encode(order),
+        lambda: codec.decode(raw_avro),
+        rounds,
+    )
+
+
+if __name__ == "__main__":
+    main()
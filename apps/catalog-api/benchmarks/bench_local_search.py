@@ -0,0 +1,80 @@
+"""Query latency of the in-process BM25 index (the OpenSearch fallback).
+
+Builds an index of synthetic products whose words follow a Zipf-like
+distribution, then times queries of one to three terms across sort modes.
+
+Run from apps/catalog-api:  python benchmarks/bench_local_search.py [--products 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import itertools
+import random
+import sys
+from pathlib import Path
+from time import perf_counter
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from app.local_search import BM25Index  # noqa: E402
+
+
+def make_vocab(n: int, rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(n)
+    ]
+
+
+def pick(vocab: list[str], cum: list[float], k: int, rng: random.Random) -> str:
+    return " ".join(rng.choices(vocab, cum_weights=cum, k=k))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--vocab", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocab = make_vocab(args.vocab, rng)
+    cum = list(itertools.accumulate(1 / (i + 1) for i in range(len(vocab))))
+    now = dt.datetime.now(dt.timezone.utc)
+
+    idx = BM25Index()
+    start = perf_counter()
+    for i in range(args.products):
+        idx.upsert(
+            {
+                "id": f"p-{i}",
+                "name": pick(vocab, cum, rng.randint(2, 4), rng),
+                "price": round(rng.uniform(1, 500), 2),
+                "description": pick(vocab, cum, rng.randint(10, 30), rng),
+                "updated_at": now - dt.timedelta(seconds=i),
+            }
+        )
+    build = perf_counter() - start
+    print(f"indexed {len(idx)} products in {build:.1f}s")
+
+    # Query terms drawn from the same distribution, so common terms dominate
+    print(f"{'terms':<7}{'sort':<12}{'p50 ms':>9}{'p99 ms':>9}")
+    for n_terms in (1, 2, 3):
+        queries = [pick(vocab, cum, n_terms, rng) for _ in range(args.queries)]
+        for sort in ("relevance", "price_asc"):
+            samples = []
+            for q in queries:
+                t = perf_counter()
+                idx.search(q, size=10, sort=sort)
+                samples.append(perf_counter() - t)
+            samples.sort()
+            p50, p99 = samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+            print(f"{n_terms:<7}{sort:<12}{p50 * 1e3:>9.2f}{p99 * 1e3:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
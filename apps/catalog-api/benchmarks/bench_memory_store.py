@@ -0,0 +1,123 @@
+"""Memory per product and query latency: ORM objects in a dict vs ProductStore.
+
+The "orm" side is the previous InMemoryProductRepository layout: ProductORM
+instances in a dict, with keyset pages and price ranges answered by sorting
+or scanning every item. The "store" side is the slotted ProductStore with its
+(price, id) and (updated_at, id) indexes.
+
+Run from apps/catalog-api:  python benchmarks/bench_memory_store.py [--products 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import gc
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from app.models import ProductORM  # noqa: E402
+from app.repositories import ProductRecord, ProductStore  # noqa: E402
+
+
+def rows(n: int) -> list[dict[str, Any]]:
+    rng = random.Random(7)
+    start = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    return [
+        {
+            "id": f"p-{i}",
+            "name": f"Product {i}",
+            "price": round(rng.uniform(1, 500), 2),
+            "description": "lorem ipsum " * rng.randint(1, 8),
+            "updated_at": start + dt.timedelta(seconds=i),
+        }
+        for i in range(n)
+    ]
+
+
+def measure(build: Callable[[], Any]) -> tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built, after - before
+
+
+def timeit(fn: Callable[[], Any], repeat: int) -> float:
+    start = perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    data = rows(args.products)
+    n = len(data)
+
+    orm, orm_bytes = measure(lambda: {r["id"]: ProductORM(**r) for r in data})
+
+    def build_store() -> ProductStore:
+        store = ProductStore()
+        for r in data:
+            store.add(ProductRecord(**r))
+        return store
+
+    store, store_bytes = measure(build_store)
+
+    ids = [f"p-{random.randrange(n)}" for _ in range(1000)]
+    mid = data[n // 2]
+    after = (mid["updated_at"], mid["id"])
+
+    def orm_page() -> list:
+        items = sorted(orm.values(), key=lambda i: (i.updated_at, i.id))
+        return [i for i in items if (i.updated_at, i.id) > after][:100]
+
+    def orm_price() -> list:
+        hits = [i for i in orm.values() if 100 <= i.price <= 101]
+        return sorted(hits, key=lambda i: (i.price, i.id))
+
+    results = [
+        ("bytes/product", orm_bytes / n, store_bytes / n, ""),
+        (
+            "get x1000 (us)",
+            timeit(lambda: [orm.get(i) for i in ids], args.repeat) * 1e6,
+            timeit(lambda: [store.get(i) for i in ids], args.repeat) * 1e6,
+            "",
+        ),
+        (
+            "keyset page (ms)",
+            timeit(orm_page, max(1, args.repeat // 10)) * 1e3,
+            timeit(lambda: store.by_updated_at(after=after, limit=100), args.repeat)
+            * 1e3,
+            "100 rows after the middle",
+        ),
+        (
+            "price range (ms)",
+            timeit(orm_price, args.repeat) * 1e3,
+            timeit(lambda: store.by_price(min_price=100, max_price=101), args.repeat)
+            * 1e3,
+            "100 <= price <= 101",
+        ),
+    ]
+    print(f"{n} products")
+    print(f"{'metric':<20}{'orm':>12}{'store':>12}  note")
+    for metric, a, b, note in results:
+        print(f"{metric:<20}{a:>12.3f}{b:>12.3f}  {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@ import asyncio
 import json
 import os
 import sys
-from typing import Any, Dict, Optional
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 
 try:
@@ -10,9 +11,58 @@ try:
 except Exception:  # pragma: no cover
     AIOKafkaProducer = None  # type: ignore
 
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except Exception:  # pragma: no cover
+    Counter = None  # type: ignore
+    Gauge = None  # type: ignore
+    Histogram = None  # type: ignore
+
+
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest")
 
 _producer: Optional["AIOKafkaProducer"] = None
 _producer_lock = asyncio.Lock()
+_producer_options: Dict[str, Any] = {}
+
+# (topic, key, value, enqueued_at) waiting for the sender task
+_queue: Optional[asyncio.Queue] = None
+_sender_task: Optional[asyncio.Task] = None
+_overflow = "block"
+_max_batch = 500
+
+_queue_depth = (
+    Gauge("catalog_events_queue_depth", "Events waiting in the producer queue")
+    if Gauge
+    else None
+)
+_batch_size_hist = (
+    Histogram(
+        "catalog_events_batch_size",
+        "Events handed to the Kafka producer per sender pass",
+        buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+    )
+    if Histogram
+    else None
+)
+_publish_latency = (
+    Histogram(
+        "catalog_events_publish_latency_seconds",
+        "Time from enqueue to broker ack",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    )
+    if Histogram
+    else None
+)
+_dropped_counter = (
+    Counter(
+        "catalog_events_dropped_total",
+        "Events dropped by the queue overflow policy or a failed send",
+        ["reason"],
+    )
+    if Counter
+    else None
+)
 
 
 def kafka_enabled() -> bool:
@@ -25,6 +75,13 @@ def kafka_enabled() -> bool:
     return os.getenv("ENABLE_KAFKA", "false").lower() in {"1", "true", "yes", "on"}
 
 
+def _printable(value: bytes) -> str:
+    try:
+        return value.decode()
+    except UnicodeDecodeError:  # Avro binary
+        return f"<{len(value)} bytes>"
+
+
 async def _ensure_producer() -> Optional["AIOKafkaProducer"]:
     global _producer
     if _producer is not None:
@@ -35,7 +92,9 @@ async def _ensure_producer() -> Optional["AIOKafkaProducer"]:
         if _producer is None:
             bootstrap = os.getenv("KAFKA_BOOTSTRAP", "localhost:9092")
             try:
-                prod = AIOKafkaProducer(bootstrap_servers=bootstrap)
+                prod = AIOKafkaProducer(
+                    bootstrap_servers=bootstrap, **_producer_options
+                )
                 await prod.start()
                 _producer = prod
             except Exception as e:  # graceful fallback
@@ -47,20 +106,191 @@ async def _ensure_producer() -> Optional["AIOKafkaProducer"]:
     return _producer
 
 
-async def publish_product_updated_async(event: Dict[str, Any]) -> None:
-    topic = os.getenv("TOPIC_PRODUCT_UPDATED", "events.catalog.product-updated")
-    # ensure updated_at as epoch millis for external_gte semantics downstream
-    if "updated_at" not in event:
-        event["updated_at"] = int(datetime.now(timezone.utc).timestamp() * 1000)
+def _on_delivered(
+    queue: asyncio.Queue, enqueued_at: float, fut: "asyncio.Future"
+) -> None:
+    error = "cancelled" if fut.cancelled() else fut.exception()
+    if error is not None:
+        if _dropped_counter:
+            _dropped_counter.labels("send_failed").inc()
+        print(f"[events] Kafka publish failed: {error}", file=sys.stderr)
+    elif _publish_latency:
+        _publish_latency.observe(perf_counter() - enqueued_at)
+    queue.task_done()
+
+
+async def _send_loop(queue: asyncio.Queue) -> None:
+    """Drain the queue into the producer without waiting per message.
+
+    `send` only waits when the producer's own buffer is full, which is what
+    pushes back on the queue; acks are handled in done callbacks.
+    """
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < _max_batch and not queue.empty():
+            batch.append(queue.get_nowait())
+        if _batch_size_hist:
+            _batch_size_hist.observe(len(batch))
+        prod = await _ensure_producer()
+        for i, (topic, key, value, enqueued_at) in enumerate(batch):
+            if prod is None:
+                print(
+                    f"[events] {topic} (stdout): {_printable(value)}", file=sys.stdout
+                )
+                queue.task_done()
+                continue
+            try:
+                fut = await prod.send(topic, value, key=key)
+            except asyncio.CancelledError:
+                for _ in batch[i:]:
+                    queue.task_done()
+                raise
+            except Exception as e:
+                if _dropped_counter:
+                    _dropped_counter.labels("send_failed").inc()
+                print(f"[events] Kafka send failed: {e}", file=sys.stderr)
+                queue.task_done()
+                continue
+            fut.add_done_callback(lambda f, t=enqueued_at: _on_delivered(queue, t, f))
+
+
+async def start_pipeline(
+    *,
+    queue_max_size: int = 10000,
+    overflow: str = "block",
+    max_batch: int = 500,
+    linger_ms: int = 5,
+    max_batch_bytes: int = 65536,
+    compression: str = "gzip",
+) -> None:
+    """Start the queue and sender task; the producer uses these batching options."""
+    global _queue, _sender_task, _overflow, _max_batch
+    if _sender_task is not None:
+        return
+    if overflow not in OVERFLOW_POLICIES:
+        raise ValueError(f"unknown overflow policy {overflow!r}")
+    _producer_options.update(
+        linger_ms=linger_ms,
+        max_batch_size=max_batch_bytes,
+        compression_type=None if compression == "none" else compression,
+    )
+    _overflow = overflow
+    _max_batch = max(1, max_batch)
+    _queue = asyncio.Queue(maxsize=max(1, queue_max_size))
+    if _queue_depth:
+        _queue_depth.set_function(_queue.qsize)
+    _sender_task = asyncio.create_task(_send_loop(_queue))
+
+
+async def flush(timeout_seconds: float = 10) -> bool:
+    """Wait until every queued event is acked (or failed); False on timeout."""
+    if _queue is None:
+        return True
+    try:
+        await asyncio.wait_for(_queue.join(), timeout_seconds)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+async def stop_pipeline(timeout_seconds: float = 10) -> None:
+    global _queue, _sender_task, _producer
+    await flush(timeout_seconds)
+    task, _sender_task = _sender_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    _queue = None
+    prod, _producer = _producer, None
+    if prod is not None:
+        try:
+            await prod.stop()
+        except Exception:
+            pass
+
+
+async def _enqueue(topic: str, key: Optional[bytes], value: bytes) -> None:
+    queue = _queue
+    assert queue is not None
+    item = (topic, key, value, perf_counter())
+    if _overflow == "block":
+        await queue.put(item)
+        return
+    try:
+        queue.put_nowait(item)
+        return
+    except asyncio.QueueFull:
+        pass
+    if _overflow == "drop_newest":
+        if _dropped_counter:
+            _dropped_counter.labels("queue_full").inc()
+        return
+    try:
+        queue.get_nowait()
+        queue.task_done()
+        if _dropped_counter:
+            _dropped_counter.labels("queue_full").inc()
+    except asyncio.QueueEmpty:
+        pass
+    queue.put_nowait(item)
+
+
+async def publish_records_async(
+    records: List[Tuple[str, Optional[bytes], bytes]],
+) -> None:
+    """Publish pre-encoded (topic, key, value) records in order.
+
+    Waits for every ack and raises on failure, including when Kafka is enabled
+    but the producer could not start, so the outbox relay can keep the rows
+    and retry. Records only go to stdout when Kafka is disabled. Bypasses the
+    queue: nothing here may be dropped.
+    """
     prod = await _ensure_producer()
     if prod is None:
-        print(f"[events] ProductUpdated (stdout): {json.dumps(event)}", file=sys.stdout)
+        if kafka_enabled():
+            raise RuntimeError("Kafka producer unavailable")
+        for topic, _, value in records:
+            print(f"[events] {topic} (stdout): {_printable(value)}", file=sys.stdout)
+        return
+    futures = [await prod.send(topic, value, key=key) for topic, key, value in records]
+    await asyncio.gather(*futures)
+
+
+async def publish_encoded_async(
+    records: List[Tuple[str, Optional[str], bytes]],
+) -> None:
+    """Queue pre-encoded (topic, key, value) events for the sender task.
+
+    Without a running pipeline they are sent directly; failures are logged.
+    """
+    if _queue is not None:
+        for topic, key, value in records:
+            await _enqueue(topic, key.encode() if key else None, value)
         return
     try:
-        key = str(event.get("id", "")).encode() if event.get("id") else None
-        await prod.send_and_wait(topic, json.dumps(event).encode("utf-8"), key=key)
+        await publish_records_async(
+            [
+                (topic, key.encode() if key else None, value)
+                for topic, key, value in records
+            ]
+        )
     except Exception as e:
-        print(f"[events] Kafka publish failed: {e}. Event: {event}", file=sys.stderr)
+        print(
+            f"[events] Kafka publish failed: {e}. Events: {len(records)}",
+            file=sys.stderr,
+        )
+
+
+async def publish_product_updated_async(event: Dict[str, Any]) -> None:
+    """Back-compat dict API: the event is JSON-encoded and queued like any other."""
+    topic = os.getenv("TOPIC_PRODUCT_UPDATED", "events.catalog.product-updated")
+    # ensure updated_at as epoch millis for external_gte semantics downstream
+    event.setdefault("updated_at", int(datetime.now(timezone.utc).timestamp() * 1000))
+    key = str(event["id"]) if event.get("id") else None
+    await publish_encoded_async([(topic, key, json.dumps(event).encode("utf-8"))])
 
 
 def publish_product_updated(event: Dict[str, Any]) -> None:
@@ -65,3 +65,579 @@ def test_search_empty_results():
     body = r.json()
     assert body["query"] == "foo"
     assert body["results"] == []
+
+
+def test_local_cache_evicts_lru_and_expires():
+    from app.cache import LocalCache
+
+    lc = LocalCache(max_entries=2, ttl_seconds=60)
+    lc.set("a", {"v": 1})
+    lc.set("b", {"v": 2})
+    assert lc.get("a") == {"v": 1}  # touch "a" so "b" is least recent
+    lc.set("c", {"v": 3})
+    assert lc.get("b") is None
+    assert lc.get("a") == {"v": 1}
+    assert len(lc) == 2
+
+    lc.set("d", {"v": 4}, ttl_seconds=0)
+    assert lc.get("d") is None
+
+
+def test_singleflight_coalesces_concurrent_loads():
+    import asyncio
+
+    from app.singleflight import SingleFlight
+
+    sf = SingleFlight("test")
+    calls = {"n": 0}
+
+    async def loader():
+        calls["n"] += 1
+        await asyncio.sleep(0.01)
+        return {"id": "p-x"}
+
+    async def run():
+        return await asyncio.gather(*(sf.do("p-x", loader) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert calls["n"] == 1
+    assert sf.coalesced == 4
+    assert all(r == {"id": "p-x"} for r in results)
+    assert sf.inflight() == 0
+
+
+def test_batch_get_products():
+    a = client.post("/products", json={"name": "Batch A", "price": 1.0}).json()["id"]
+    b = client.post("/products", json={"name": "Batch B", "price": 2.0}).json()["id"]
+
+    r = client.get("/products", params={"ids": f"{b},missing,{a},{b}"})
+    assert r.status_code == 200
+    body = r.json()
+    assert [p["id"] for p in body["results"]] == [b, a]
+    assert body["missing"] == ["missing"]
+
+    r2 = client.post("/products:batchGet", json={"ids": [a]})
+    assert r2.status_code == 200
+    assert r2.json()["results"][0]["name"] == "Batch A"
+
+
+def test_search_cursor_and_filters():
+    from app.search import build_query, decode_cursor, encode_cursor
+
+    cursor = encode_cursor("price_asc", [9.99, "p-1"])
+    assert decode_cursor(cursor, "price_asc") == [9.99, "p-1"]
+
+    body = build_query(
+        "shoe", sort="price_asc", min_price=5, search_after=[9.99, "p-1"]
+    )
+    assert body["query"]["bool"]["filter"] == [{"range": {"price": {"gte": 5}}}]
+    assert body["search_after"] == [9.99, "p-1"]
+
+    r = client.get("/search", params={"q": "shoe", "sort": "newest", "cursor": cursor})
+    assert r.status_code == 400
+    r2 = client.get("/search", params={"q": "shoe", "cursor": "not-a-cursor"})
+    assert r2.status_code == 400
+
+
+def test_search_cache_key_is_canonical():
+    from app.search_cache import search_cache_key
+
+    a = search_cache_key("  Shoes ", size=10, sort="relevance", cursor=None)
+    b = search_cache_key("shoes", sort="relevance", size=10)
+    c = search_cache_key("ＳＨＯＥＳ", size=10, sort="relevance")
+    assert a == b == c
+    assert search_cache_key("shoes", size=20, sort="relevance") != a
+
+
+def test_search_cache_serves_stale_and_refreshes_once():
+    import asyncio
+
+    from app import cache
+    from app.search_cache import cached_search
+
+    calls = {"n": 0}
+
+    async def loader():
+        calls["n"] += 1
+        await asyncio.sleep(0.01)
+        return {"query": "x", "results": [], "n": calls["n"]}
+
+    async def run():
+        kw = {"soft_ttl_seconds": 0, "hard_ttl_seconds": 60}
+        first = await cached_search("search:test-swr", loader, **kw)
+        stale = await asyncio.gather(
+            *(cached_search("search:test-swr", loader, **kw) for _ in range(3))
+        )
+        await asyncio.sleep(0.05)
+        return first, stale
+
+    cache.init_local_cache(100, 60)
+    try:
+        first, stale = asyncio.run(run())
+    finally:
+        cache.init_local_cache(0, 0)
+    assert first["n"] == 1
+    assert all(s["n"] == 1 for s in stale)
+    assert calls["n"] == 2  # one background refresh for three stale hits
+
+
+def test_raw_response_cache_hit(monkeypatch):
+    from app import cache, routes
+    from app.config import Settings
+
+    settings = Settings(cache_raw_responses=True)
+    monkeypatch.setattr(routes, "get_settings", lambda: settings)
+    cache.init_local_cache(100, 60)
+    try:
+        pid = client.post("/products", json={"name": "Raw", "price": 3.0}).json()["id"]
+        r = client.get(f"/products/{pid}")
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/json"
+        assert r.json()["name"] == "Raw"
+        # Raw entries are plain JSON, so the codec-aware readers still decode them
+        assert cache._serializer.decode(r.content)["id"] == pid
+    finally:
+        cache.init_local_cache(0, 0)
+
+
+def test_bulk_import_streams_per_line_results():
+    import json
+
+    body = b"\n".join(
+        [
+            b'{"name": "Bulk A", "price": 1.5}',
+            b"",
+            b'{"name": "", "price": 2}',
+            b"not json",
+            b'{"name": "Bulk B", "price": 3, "description": "d"}',
+        ]
+    )
+    r = client.post(
+        "/products:bulk",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert r.status_code == 200
+    results = [json.loads(line) for line in r.text.splitlines()]
+    by_line = {res["line"]: res for res in results}
+    assert by_line[1]["status"] == "created"
+    assert by_line[3]["status"] == "error"
+    assert by_line[4]["status"] == "error"
+    assert by_line[5]["status"] == "created"
+
+    got = client.get(f"/products/{by_line[5]['id']}")
+    assert got.json()["name"] == "Bulk B"
+
+
+def test_list_products_keyset_pages_and_changes(monkeypatch):
+    import json
+
+    from app import routes
+    from app.config import Settings
+
+    created = [
+        client.post("/products", json={"name": f"Paged {i}", "price": 1}).json()["id"]
+        for i in range(5)
+    ]
+    # Walk every page: each product is listed once, ours in creation order
+    seen, params = [], {"limit": 2}
+    while True:
+        r = client.get("/products", params=params)
+        assert r.status_code == 200
+        lines = [json.loads(line) for line in r.text.splitlines()]
+        if lines and "next_cursor" in lines[-1]:
+            assert len(lines) == 3
+            seen += [p["id"] for p in lines[:-1]]
+            params["after"] = lines[-1]["next_cursor"]
+            continue
+        assert len(lines) < 2
+        seen += [p["id"] for p in lines]
+        break
+    assert len(seen) == len(set(seen))
+    assert [pid for pid in seen if pid in created] == created
+
+    # Without `limit` the configured page size applies, and `limit` is capped
+    settings = Settings(list_page_size=2, list_max_page_size=3)
+    monkeypatch.setattr(routes, "get_settings", lambda: settings)
+    for params, rows in (({}, 2), ({"limit": 100}, 3)):
+        lines = client.get("/products", params=params).text.splitlines()
+        assert len(lines) == rows + 1 and "next_cursor" in json.loads(lines[-1])
+
+    pid = client.post("/products", json={"name": "Changed", "price": 1}).json()["id"]
+    since = client.get(f"/products/{pid}").json()["updated_at"]
+    # Inside the settle window the row is held back for a later poll
+    r3 = client.get("/products/changes", params={"since": since})
+    assert pid not in [json.loads(line)["id"] for line in r3.text.splitlines()]
+    settings = Settings(changes_settle_seconds=0)
+    monkeypatch.setattr(routes, "get_settings", lambda: settings)
+    r4 = client.get("/products/changes", params={"since": since})
+    assert pid in [json.loads(line)["id"] for line in r4.text.splitlines()]
+
+    assert client.get("/products", params={"after": "%%%"}).status_code == 400
+
+
+def test_list_products_by_price_range():
+    import json
+
+    ids = [
+        client.post("/products", json={"name": f"Ranged {p}", "price": p}).json()["id"]
+        for p in (7003, 7001.5, 7002, 7010)
+    ]
+    params = {"min_price": 7001, "max_price": 7005, "limit": 2}
+    r = client.get("/products", params=params)
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [p["price"] for p in lines[:2]] == [7001.5, 7002]
+    assert "next_cursor" in lines[-1]
+
+    params["after"] = lines[-1]["next_cursor"]
+    rest = [
+        json.loads(line)
+        for line in client.get("/products", params=params).text.splitlines()
+    ]
+    assert [p["id"] for p in rest] == [ids[0]]
+    assert (
+        client.get("/products", params={"min_price": 1, "after": "%%%"}).status_code
+        == 400
+    )
+
+
+def test_replica_pick_skips_ejected_replicas(monkeypatch):
+    import asyncio
+
+    from app import db
+
+    def replica(name):
+        r = db._Replica.__new__(db._Replica)
+        r.name, r.inflight, r.failures, r.ejected_until = name, 0, 0, 0.0
+        r.latency_ewma = 0.0
+        return r
+
+    a, b = replica("a"), replica("b")
+    monkeypatch.setattr(db, "_replicas", [a, b])
+    monkeypatch.setattr(db, "_eject_after_failures", 2)
+    assert {db._pick_replica().name for _ in range(4)} == {"a", "b"}
+
+    db._record_replica_failure(a)
+    db._record_replica_failure(a)
+    assert {db._pick_replica().name for _ in range(4)} == {"b"}
+
+    monkeypatch.setattr(db, "_replica_selection", "least_connections")
+    b.inflight = 1
+    a.ejected_until = 0.0
+    assert db._pick_replica() is a
+
+    # Sustained slowness ejects; a single slow session does not
+    monkeypatch.setattr(db, "_max_latency_seconds", 0.1)
+    db._record_replica_success(a, 0.3)
+    assert a.healthy(db.monotonic())
+    for _ in range(5):
+        db._record_replica_success(a, 0.3)
+    assert not a.healthy(db.monotonic())
+
+    # Streamed listings hold their session open; only run_read is sampled
+    class Session:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def slow_read(session=None):
+        await asyncio.sleep(0.02)
+
+    async def streamed():
+        async with db.read_session_scope():
+            await slow_read()
+
+    b.session_maker, b.inflight, b.latency_ewma = Session, 0, 0.0
+    monkeypatch.setattr(db, "_replicas", [b])
+    asyncio.run(streamed())
+    assert b.latency_ewma == 0.0
+    asyncio.run(db.run_read(slow_read))
+    assert b.latency_ewma > 0
+
+
+def test_failed_replica_read_is_retried_on_the_primary(tmp_path, monkeypatch):
+    import asyncio
+
+    import pytest
+    from sqlalchemy import text
+
+    pytest.importorskip("aiosqlite")
+    from app import db
+
+    async def run():
+        db.init_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+        # A replica whose database file cannot be opened
+        db.init_replicas(
+            [f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"],
+            eject_after_failures=2,
+        )
+        try:
+
+            async def read(session):
+                return (await session.execute(text("SELECT 1"))).scalar()
+
+            assert [await db.run_read(read) for _ in range(3)] == [1, 1, 1]
+            # Two failures ejected it, so the third read went straight to the primary
+            assert not db._replicas[0].healthy(db.monotonic())
+        finally:
+            db.init_replicas([])
+            await db._engine.dispose()
+            db._engine = db._session_maker = None
+
+    asyncio.run(run())
+
+
+def test_versioned_cache_set_keeps_newer_entry():
+    import asyncio
+
+    from app import cache
+
+    async def run():
+        await cache.cache_set("product:v", {"name": "new"}, 60, version=2)
+        await cache.cache_set("product:v", {"name": "old"}, 60, version=1)
+        kept = await cache.cache_get("product:v")
+        await cache.cache_set_many(
+            {"product:v": {"name": "older"}}, 60, versions={"product:v": 0}
+        )
+        await cache.cache_set("product:v", {"name": "same"}, 60, version=2)
+        return kept, await cache.cache_get("product:v")
+
+    cache.init_local_cache(100, 60)
+    try:
+        kept, same = asyncio.run(run())
+    finally:
+        cache.init_local_cache(0, 0)
+    assert kept == {"name": "new"}
+    assert same == {"name": "same"}
+
+
+def test_failed_versioned_write_deletes_the_old_entry(monkeypatch):
+    import asyncio
+
+    from prometheus_client import REGISTRY
+
+    from app import cache
+
+    deleted = []
+
+    class FlakyRedis:
+        async def delete(self, *keys):
+            deleted.extend(keys)
+
+    async def failing_cas(**kwargs):
+        raise ConnectionError("redis timeout")
+
+    def failures():
+        return (
+            REGISTRY.get_sample_value(
+                "catalog_cache_write_failures_total",
+                {"cache": "product", "outcome": "deleted"},
+            )
+            or 0
+        )
+
+    monkeypatch.setattr(cache, "_redis", FlakyRedis())
+    monkeypatch.setattr(cache, "_cas_set", failing_cas)
+    before = failures()
+    asyncio.run(
+        cache.cache_set("product:f", {"name": "x"}, 60, cache_name="product", version=3)
+    )
+    assert deleted == ["product:f"]
+    assert failures() == before + 1
+
+
+def test_warmup_loads_in_batches_and_reports_progress():
+    import asyncio
+
+    from app import warmup
+
+    seen = []
+
+    async def load_batch(ids):
+        seen.append(ids)
+        return len(ids) - 1 if "missing" in ids else len(ids)
+
+    asyncio.run(
+        warmup.run_warmup(
+            ["p-1", "p-2", "p-1", "missing", "p-3"],
+            load_batch,
+            batch_size=2,
+            concurrency=2,
+            deadline_seconds=5,
+        )
+    )
+    assert seen == [["p-1", "p-2"], ["missing", "p-3"]]
+    assert warmup.progress()["status"] == "done"
+    assert warmup.progress()["loaded"] == 3
+    assert not warmup.in_progress()
+    assert client.get("/readyz").json()["warmup"]["total"] == 4
+
+
+def test_hot_key_tracker_finds_heavy_hitters_and_decays():
+    from app.hotkeys import HotKeyTracker
+
+    # Row indexes come from a stable hash, so the collisions here are the same
+    # on every run; the width keeps each cold key's estimate far below warm's
+    t = HotKeyTracker(top_k=3, width=4096, depth=4, half_life_seconds=3600)
+    for i in range(500):
+        t.add("product:hot")
+        if i % 2 == 0:
+            t.add("product:warm")
+        t.add(f"product:cold-{i}")
+    ranked = t.top(2)
+    assert [k for k, _ in ranked] == ["product:hot", "product:warm"]
+    assert ranked[0][1] >= 500
+    assert 0.4 <= t.share_at(1) < 0.5  # 500 of 1250 reads
+    assert max(t.estimate(f"product:cold-{i}") for i in range(500)) < 250
+
+    t.decay()
+    assert t.top(1)[0][1] == ranked[0][1] // 2
+
+
+def test_suggest_trie_completes_word_prefixes():
+    from app import suggest
+
+    trie = suggest.PrefixTrie(
+        [("Running Shoes", 3.0), ("Rain Jacket", 2.0), ("Shoe Polish", 1.0)]
+    )
+    assert trie.lookup("r", 2) == ["Running Shoes", "Rain Jacket"]
+    assert trie.lookup("  SHO", 2) == ["Running Shoes", "Shoe Polish"]
+    assert trie.lookup("sho", 3) is None  # not enough completions in-process
+    assert trie.lookup("x", 1) is None
+
+    r = client.get("/search/suggest", params={"prefix": "sho"})
+    assert r.status_code == 200
+    assert r.json() == {"prefix": "sho", "suggestions": []}
+
+
+def test_local_search_ranks_name_matches_and_pages():
+    from app.local_search import BM25Index
+
+    idx = BM25Index()
+    idx.upsert({"id": "a", "name": "Trail Shoe", "price": 50, "description": None})
+    idx.upsert({"id": "b", "name": "Sock", "price": 5, "description": "for a shoe"})
+    idx.upsert({"id": "c", "name": "Road Shoe", "price": 80, "description": "shoe"})
+    items, last = idx.search("shoe", size=2)
+    assert [i["id"] for i in items] == ["a", "c"]  # equal name scores, id order
+    rest, _ = idx.search("shoe", size=2, search_after=last)
+    assert [i["id"] for i in rest] == ["b"]
+
+    items, _ = idx.search("shoe", sort="price_asc", max_price=60)
+    assert [i["id"] for i in items] == ["b", "a"]
+    idx.upsert({"id": "a", "name": "Trail Boot", "price": 50, "description": None})
+    assert "a" not in [i["id"] for i in idx.search("shoe")[0]]
+
+    # Memory mode: products created through the API are searchable
+    client.post("/products", json={"name": "Zephyr Kettle", "price": 12})
+    r = client.get("/search", params={"q": "zephyr"})
+    assert [p["name"] for p in r.json()["results"]] == ["Zephyr Kettle"]
+
+
+def test_product_store_indexes_follow_updates():
+    import datetime as dt
+
+    from app.repositories import ProductRecord, ProductStore
+
+    t0 = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    store = ProductStore()
+    for i, price in enumerate([5.0, 1.0, 3.0]):
+        store.add(ProductRecord(f"p-{i}", f"P{i}", price, None, t0.replace(second=i)))
+
+    assert [r.id for r in store.by_price(min_price=1, max_price=3)] == ["p-1", "p-2"]
+    store.update("p-1", price=9.0, updated_at=t0.replace(second=9))
+    assert [r.id for r in store.by_price(min_price=1, max_price=3)] == ["p-2"]
+    assert [r.id for r in store.by_updated_at()] == ["p-0", "p-2", "p-1"]
+    assert [r.id for r in store.by_updated_at(after=(t0, "p-0"), limit=1)] == ["p-2"]
+    assert [r.id for r in store.by_updated_at(since=t0.replace(second=2))] == [
+        "p-2",
+        "p-1",
+    ]
+
+
+def test_avro_event_encoding_round_trips_and_validates():
+    import pytest
+
+    from app import events_adapter
+    from app.event_codec import HEADER_LEN, MAGIC
+
+    events_adapter.init_event_encoding("avro")
+    try:
+        product = {"id": "p-1", "name": "Kettle", "price": 12, "description": None}
+        [(topic, key, raw)] = events_adapter.product_updated_records([product])
+        assert raw[:2] == MAGIC and key == "p-1"
+        codec = events_adapter._codec
+        assert raw[:HEADER_LEN] == codec.header
+        event = codec.decode(raw)
+        assert event["product_id"] == "p-1" and event["price"] == 12.0
+        assert event["description"] == ""
+        with pytest.raises((TypeError, ValueError)):
+            events_adapter.encode_product_updated(product | {"name": None})
+    finally:
+        events_adapter.init_event_encoding("json")
+    assert events_adapter.encode_product_updated(product).startswith(b"{")
+
+
+def test_product_update_evicts_cached_searches_showing_it(monkeypatch):
+    import pytest
+
+    from app import cache, routes
+    from app.cache import TagIndex
+    from app.config import Settings
+
+    settings = Settings(search_invalidation_delay_seconds=0)
+    monkeypatch.setattr(routes, "get_settings", lambda: settings)
+    cache.init_local_cache(100, 600)
+    try:
+        pid = client.post("/products", json={"name": "Quokka Lamp", "price": 10})
+        pid = pid.json()["id"]
+        assert client.get("/search", params={"q": "quokka"}).json()["results"][0][
+            "price"
+        ] == pytest.approx(10)
+        client.put(f"/products/{pid}", json={"name": "Quokka Lamp", "price": 20})
+        r = client.get("/search", params={"q": "quokka"})
+        assert r.json()["results"][0]["price"] == pytest.approx(20)
+    finally:
+        cache.init_local_cache(0, 0)
+
+    # Bounded: full tags refuse keys, evicted tags hand back their keys
+    tags = TagIndex(max_tags=2, max_keys_per_tag=1)
+    assert tags.add("k1", ["a"]) == (True, set())
+    assert tags.add("k2", ["a"]) == (False, set())
+    assert tags.add("k3", ["b", "c"]) == (True, {"k1"})
+    assert tags.pop(["b", "x"]) == {"k3"} and len(tags) == 1
+
+
+def test_conditional_get_answers_304_from_cached_version(monkeypatch):
+    from app import cache, routes
+    from app.config import Settings
+
+    settings = Settings(product_cache_control="max-age=30")
+    monkeypatch.setattr(routes, "get_settings", lambda: settings)
+    cache.init_local_cache(100, 60)
+    try:
+        pid = client.post("/products", json={"name": "Tagged", "price": 4}).json()["id"]
+        r = client.get(f"/products/{pid}")
+        etag, last_modified = r.headers["etag"], r.headers["last-modified"]
+        assert etag.startswith('"') and r.headers["cache-control"] == "max-age=30"
+
+        async def no_load(*args, **kwargs):
+            raise AssertionError("304 must not load the product")
+
+        with monkeypatch.context() as m:
+            m.setattr(routes, "_load_product", no_load)
+            for headers in (
+                {"If-None-Match": f'"x", W/{etag}'},
+                {"If-Modified-Since": last_modified},
+            ):
+                r304 = client.get(f"/products/{pid}", headers=headers)
+                assert r304.status_code == 304 and not r304.content
+                assert r304.headers["etag"] == etag
+
+        client.put(f"/products/{pid}", json={"name": "Tagged", "price": 5})
+        r2 = client.get(f"/products/{pid}", headers={"If-None-Match": etag})
+        assert r2.status_code == 200 and r2.headers["etag"] != etag
+    finally:
+        cache.init_local_cache(0, 0)
@@ -1,7 +1,10 @@
 import asyncio
+import datetime as dt
+import io
+import json
 import os
 import time
-from typing import List
+from typing import Any, Dict, List
 
 SERVICE = os.getenv("SERVICE_NAME", "indexer-worker")
 
@@ -10,11 +13,75 @@ try:
 except Exception:  # pragma: no cover
     AIOKafkaConsumer = None  # type: ignore
 
+try:
+    from fastavro import parse_schema, schemaless_reader
+    from fastavro.schema import fingerprint, to_parsing_canonical_form
+except Exception:  # pragma: no cover
+    parse_schema = None  # type: ignore
+
+# Avro events: C3 01 + 8-byte CRC-64-AVRO schema fingerprint + schemaless body
+AVRO_MAGIC = b"\xc3\x01"
+AVRO_HEADER_LEN = 10
+AVRO_SCHEMA_DIR = os.getenv(
+    "AVRO_SCHEMA_DIR",
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "..", "contracts", "avro")
+    ),
+)
+_EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
 
 def kafka_enabled() -> bool:
     return os.getenv("ENABLE_KAFKA", "false").lower() in {"1", "true", "yes", "on"}
 
 
+# Writer schemas by fingerprint, parsed once
+_avro_schemas: Dict[bytes, Any] = {}
+
+
+def load_avro_schemas(schema_dir: str = AVRO_SCHEMA_DIR) -> None:
+    if parse_schema is None:
+        return
+    for name in ("ProductUpdated", "OrderCreated"):
+        try:
+            with open(os.path.join(schema_dir, f"{name}.avsc")) as f:
+                schema = parse_schema(json.load(f))
+            fp = fingerprint(to_parsing_canonical_form(schema), "CRC-64-AVRO")
+            _avro_schemas[bytes.fromhex(fp)] = schema
+        except Exception as e:
+            print(f"[{SERVICE}] Avro schema {name} not loaded: {e}")
+
+
+def _epoch_millis(iso: str) -> int:
+    at = dt.datetime.fromisoformat(iso)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=dt.timezone.utc)
+    return (at - _EPOCH) // dt.timedelta(milliseconds=1)
+
+
+def decode_event(value: bytes) -> Dict[str, Any]:
+    """Decode a JSON or Avro event value.
+
+    ProductUpdated Avro records are mapped to the JSON event's shape (id,
+    name, price, description, updated_at in epoch millis).
+    """
+    if value[:2] != AVRO_MAGIC:
+        return json.loads(value)
+    schema = _avro_schemas.get(value[2:AVRO_HEADER_LEN])
+    if schema is None:
+        raise ValueError(f"unknown Avro schema {value[2:AVRO_HEADER_LEN].hex()}")
+    record = schemaless_reader(io.BytesIO(value[AVRO_HEADER_LEN:]), schema)
+    if schema["name"] == "events.catalog.ProductUpdated":
+        return {
+            "id": record["product_id"],
+            "name": record["name"],
+            "price": record["price"],
+            "description": record["description"] or None,
+            "updated_at": _epoch_millis(record["updated_at"]),
+        }
+    return record
+
+
 # OpenSearch client setup
 _os_client = None
 
@@ -41,11 +108,41 @@ def ensure_index(index: str = "products"):
     try:
         if not client.indices.exists(index=index):
             body = {
-                "settings": {"number_of_shards": 1, "number_of_replicas": 0},
+                "settings": {
+                    "number_of_shards": 1,
+                    "number_of_replicas": 0,
+                    # name.suggest stores every word prefix (edge n-grams) so
+                    # GET /search/suggest is a single term lookup per word
+                    "analysis": {
+                        "filter": {
+                            "autocomplete_edge_ngram": {
+                                "type": "edge_ngram",
+                                "min_gram": 1,
+                                "max_gram": 20,
+                            }
+                        },
+                        "analyzer": {
+                            "autocomplete": {
+                                "type": "custom",
+                                "tokenizer": "standard",
+                                "filter": ["lowercase", "autocomplete_edge_ngram"],
+                            }
+                        },
+                    },
+                },
                 "mappings": {
                     "properties": {
                         "product_id": {"type": "keyword"},
-                        "name": {"type": "text"},
+                        "name": {
+                            "type": "text",
+                            "fields": {
+                                "suggest": {
+                                    "type": "text",
+                                    "analyzer": "autocomplete",
+                                    "search_analyzer": "standard",
+                                }
+                            },
+                        },
                         "description": {"type": "text"},
                         "price": {"type": "float"},
                         "updated_at": {"type": "date", "format": "epoch_millis"},
@@ -86,7 +183,7 @@ async def consume_loop():
                 async for msg in consumer:
                     try:
                         key = msg.key.decode() if msg.key else None
-                        val = msg.value.decode()
+                        val = decode_event(msg.value)
                         print(
                             f"[{SERVICE}] received topic={msg.topic} key={key} value={val}"
                         )
@@ -102,19 +199,12 @@ async def consume_loop():
             await asyncio.sleep(5)
 
 
-def upsert_product(raw: str, index: str = "products"):
+def upsert_product(data: Dict[str, Any], index: str = "products"):
     """
     Upsert product document using external_gte semantics with updated_at as version.
-    Expects JSON with keys: id, name, price, description?, updated_at(epoch millis)
+    Expects a decoded event with keys: id, name, price, description?,
+    updated_at(epoch millis)
     """
-    import json
-
-    try:
-        data = json.loads(raw)
-    except Exception as e:
-        print(f"[{SERVICE}] invalid JSON payload: {e}")
-        return
-
     client = get_os_client()
     if client is None:
         return
@@ -166,6 +256,8 @@ def main():
     except Exception:
         pass
 
+    load_avro_schemas()
+
     # Ensure index exists early
     try:
         ensure_index("products")
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20251018_000002"
+down_revision = "20250831_000001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Transactional outbox for OrderCreated events (drained by the relay)
+    op.create_table(
+        "orders_outbox",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("topic", sa.String(length=255), nullable=False),
+        sa.Column("key", sa.String(length=128), nullable=True),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("orders_outbox")
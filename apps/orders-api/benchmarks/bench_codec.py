@@ -0,0 +1,60 @@
+"""Compare cache codecs on order payloads: encode/decode time and stored bytes.
+
+Run from apps/orders-api:  python benchmarks/bench_codec.py [--items 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from timeit import timeit
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from orders_app.codec import CacheSerializer, available_codecs  # noqa: E402
+
+
+def make_order(n_items: int) -> dict:
+    return {
+        "id": "o-1a2b3c4d",
+        "customer_id": "c-42",
+        "status": "CREATED",
+        "currency": "USD",
+        "total_amount": 1234.56,
+        "created_at": None,
+        "items": [
+            {"product_id": f"p-{i:08x}", "quantity": i % 5 + 1, "unit_price": 9.99}
+            for i in range(n_items)
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--compress-min-bytes", type=int, default=1024)
+    args = parser.parse_args()
+
+    order = make_order(args.items)
+    print(f"order with {args.items} items, {args.rounds} rounds")
+    print(f"{'codec':<16}{'bytes':>10}{'encode us':>12}{'decode us':>12}")
+    for name in available_codecs():
+        for compress in (0, args.compress_min_bytes):
+            ser = CacheSerializer(name, compress)
+            raw = ser.encode(order)
+            assert ser.decode(raw) == order
+            enc = timeit(lambda: ser.encode(order), number=args.rounds)
+            dec = timeit(lambda: ser.decode(raw), number=args.rounds)
+            label = name + ("+zlib" if compress else "")
+            print(
+                f"{label:<16}{len(raw):>10}"
+                f"{enc / args.rounds * 1e6:>12.1f}{dec / args.rounds * 1e6:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, Response, HTTPException
+from fastapi import FastAPI, Response, HTTPException, Query
 from contextlib import asynccontextmanager
 
 from .config import get_settings
-from . import db
+from . import db, outbox
 from .models import Base
-from .cache import init_redis, ping as redis_ping
+from .cache import (
+    hot_keys,
+    init_codec,
+    init_hot_keys,
+    init_redis,
+    ping as redis_ping,
+)
 from .routes import router
 from .errors import http_exception_handler
+from .events_adapter import init_event_encoding
+from .events import publish_records_async, start_pipeline, stop_pipeline
 
 from opentelemetry import trace
 from opentelemetry.sdk.resources import Resource
@@ -44,17 +52,57 @@ def create_app() -> FastAPI:
                 )
             except Exception:
                 pass
+        await start_pipeline(
+            queue_max_size=settings.events_queue_max_size,
+            overflow=settings.events_queue_overflow,
+            max_batch=settings.events_max_batch,
+            linger_ms=settings.kafka_linger_ms,
+            max_batch_bytes=settings.kafka_max_batch_bytes,
+            compression=settings.kafka_compression,
+        )
+        outbox.start_relay(
+            publish_records_async,
+            batch_size=settings.outbox_batch_size,
+            poll_interval_seconds=settings.outbox_poll_interval_seconds,
+        )
         yield
+        await outbox.stop_relay()
+        await stop_pipeline(settings.events_flush_timeout_seconds)
 
     app = FastAPI(title="Orders API", version="1.0.0", lifespan=lifespan)
     app.add_exception_handler(HTTPException, http_exception_handler)
 
     if settings.db_url:
         try:
-            db.init_engine(settings.db_url)
+            db.init_engine(
+                settings.db_url,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_timeout_seconds=settings.db_pool_timeout_seconds,
+                pool_recycle_seconds=settings.db_pool_recycle_seconds,
+                pool_pre_ping=settings.db_pool_pre_ping,
+                connect_timeout_seconds=settings.db_connect_timeout_seconds,
+                statement_timeout_ms=settings.db_statement_timeout_ms,
+                prepared_statement_cache_size=settings.db_prepared_statement_cache_size,
+            )
+            db.init_replicas(
+                settings.db_replica_urls,
+                selection=settings.db_replica_selection,
+                eject_after_failures=settings.db_replica_eject_after_failures,
+                eject_seconds=settings.db_replica_eject_seconds,
+                max_latency_ms=settings.db_replica_max_latency_ms,
+            )
         except Exception:
             pass
     init_redis(settings.redis_url)
+    init_codec(settings.cache_codec, settings.cache_compress_min_bytes)
+    init_hot_keys(settings.hot_keys_top_k, settings.hot_keys_half_life_seconds)
+    outbox.init_outbox(settings.outbox_enabled)
+    init_event_encoding(
+        settings.event_encoding,
+        validate_avro=settings.validate_avro,
+        schema_dir=settings.avro_schema_dir,
+    )
 
     @app.get("/healthz")
     async def healthz():
@@ -73,6 +121,10 @@ def create_app() -> FastAPI:
         payload = generate_latest()
         return Response(content=payload, media_type=CONTENT_TYPE_LATEST)
 
+    @app.get("/debug/hot-keys")
+    def debug_hot_keys(limit: int = Query(20, ge=1, le=1000)):
+        return hot_keys(limit)
+
     @app.get("/readyz")
     async def readyz():
         db_ok = await db.healthcheck() if settings.db_url else True
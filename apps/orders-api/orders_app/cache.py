@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-import json
 from typing import Any, Optional
 from time import perf_counter
 
+from .codec import CacheSerializer
+from .hotkeys import HotKeyTracker, export_metrics
+
 try:
     from redis import asyncio as aioredis
 except Exception:  # pragma: no cover
@@ -16,6 +18,8 @@ except Exception:  # pragma: no cover
     Histogram = None  # type: ignore
 
 _redis = None
+_serializer = CacheSerializer()
+_hot_keys: Optional[HotKeyTracker] = None
 _hit_counter = (
     Counter("orders_cache_hits_total", "Cache hits", ["cache"]) if Counter else None
 )
@@ -29,52 +33,140 @@ _latency_hist = (
 )
 
 
+def init_codec(codec: str, compress_min_bytes: int = 0) -> None:
+    global _serializer
+    _serializer = CacheSerializer(codec, compress_min_bytes)
+
+
+def init_hot_keys(top_k: int, half_life_seconds: float) -> None:
+    """Track the hottest keys read through cache_get; top_k <= 0 disables it."""
+    global _hot_keys
+    if top_k <= 0:
+        _hot_keys = None
+        return
+    _hot_keys = HotKeyTracker(top_k, half_life_seconds=half_life_seconds)
+    export_metrics(_hot_keys)
+
+
+def hot_keys(limit: int | None = None) -> dict[str, Any]:
+    if _hot_keys is None:
+        return {"enabled": False, "total": 0, "keys": []}
+    total = _hot_keys.total
+    return {
+        "enabled": True,
+        "total": total,
+        "half_life_seconds": _hot_keys.half_life_seconds,
+        "keys": [
+            {"key": k, "count": c, "share": round(c / total, 4) if total else 0.0}
+            for k, c in _hot_keys.top(limit)
+        ],
+    }
+
+
 def init_redis(redis_url: str | None):
     global _redis
     if not redis_url or aioredis is None:
         _redis = None
         return
     try:
-        _redis = aioredis.from_url(redis_url, decode_responses=True)
+        _redis = aioredis.from_url(redis_url, decode_responses=False)
     except Exception:
         _redis = None
 
 
-async def cache_get(
-    key: str, *, cache_name: str = "default"
-) -> Optional[dict[str, Any]]:
+def _version_key(key: str) -> str:
+    return f"{key}#ver"
+
+
+async def _get(
+    key: str, *, cache_name: str, versioned: bool
+) -> tuple[Optional[dict[str, Any]], Optional[int]]:
+    if _hot_keys is not None:
+        _hot_keys.add(key)
     if _redis is None:
-        return None
+        return None, None
     try:
         start = perf_counter()
-        val = await _redis.get(key)
+        if versioned:
+            val, ver = await _redis.mget(key, _version_key(key))
+        else:
+            val, ver = await _redis.get(key), None
         if _latency_hist:
             _latency_hist.labels("get", cache_name).observe(perf_counter() - start)
         if not val:
             if _miss_counter:
                 _miss_counter.labels(cache_name).inc()
-            return None
+            return None, None
         if _hit_counter:
             _hit_counter.labels(cache_name).inc()
-        return json.loads(val)
+        return _serializer.decode(val), int(ver) if ver else None
+    except Exception:
+        return None, None
+
+
+async def cache_get(
+    key: str, *, cache_name: str = "default"
+) -> Optional[dict[str, Any]]:
+    value, _ = await _get(key, cache_name=cache_name, versioned=False)
+    return value
+
+
+async def cache_get_versioned(
+    key: str, *, cache_name: str = "default"
+) -> tuple[Optional[dict[str, Any]], Optional[int]]:
+    """cache_get plus the version stored with the entry, in one MGET."""
+    return await _get(key, cache_name=cache_name, versioned=True)
+
+
+async def cache_get_version(key: str) -> Optional[int]:
+    """Only the version stored with a cached entry (None when absent)."""
+    if _redis is None:
+        return None
+    try:
+        ver = await _redis.get(_version_key(key))
+        return int(ver) if ver else None
     except Exception:
         return None
 
 
 async def cache_set(
-    key: str, value: dict[str, Any], ttl_seconds: int, *, cache_name: str = "default"
+    key: str,
+    value: dict[str, Any],
+    ttl_seconds: int,
+    *,
+    cache_name: str = "default",
+    version: Optional[int] = None,
 ) -> None:
+    """Write a value; `version` is stored beside it under the same TTL."""
     if _redis is None:
         return
     try:
         start = perf_counter()
-        await _redis.setex(key, ttl_seconds, json.dumps(value))
+        if version is None:
+            await _redis.setex(key, ttl_seconds, _serializer.encode(value))
+        else:
+            pipe = _redis.pipeline(transaction=True)
+            pipe.setex(key, ttl_seconds, _serializer.encode(value))
+            pipe.setex(_version_key(key), ttl_seconds, version)
+            await pipe.execute()
         if _latency_hist:
             _latency_hist.labels("set", cache_name).observe(perf_counter() - start)
     except Exception:
         return
 
 
+async def cache_delete(key: str, *, cache_name: str = "default") -> None:
+    if _redis is None:
+        return
+    try:
+        start = perf_counter()
+        await _redis.delete(key)
+        if _latency_hist:
+            _latency_hist.labels("delete", cache_name).observe(perf_counter() - start)
+    except Exception:
+        return
+
+
 async def ping() -> bool:
     if _redis is None:
         return False
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import msgpack
+except Exception:  # pragma: no cover
+    msgpack = None  # type: ignore
+
+# Wire format of a cache value:
+#   byte 0   format version (FORMAT_VERSION)
+#   byte 1   codec id
+#   byte 2   flags (FLAG_ZLIB)
+#   rest     encoded body
+# Values written before this header existed are plain JSON text and are still
+# readable, as are values written by any codec below regardless of which one is
+# configured, so codecs can be switched on a live cache.
+FORMAT_VERSION = 1
+FLAG_ZLIB = 0x01
+_HEADER_LEN = 3
+
+
+class JsonCodec:
+    name = "json"
+    codec_id = 1
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, body: bytes) -> Any:
+        return json.loads(body)
+
+
+class OrjsonCodec:
+    name = "orjson"
+    codec_id = 2
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def loads(self, body: bytes) -> Any:
+        return orjson.loads(body)
+
+
+class MsgpackCodec:
+    name = "msgpack"
+    codec_id = 3
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, body: bytes) -> Any:
+        return msgpack.unpackb(body, raw=False)
+
+
+_CODECS = {
+    c.name: c
+    for c in (
+        JsonCodec(),
+        *((OrjsonCodec(),) if orjson is not None else ()),
+        *((MsgpackCodec(),) if msgpack is not None else ()),
+    )
+}
+_BY_ID = {c.codec_id: c for c in _CODECS.values()}
+
+
+def available_codecs() -> list[str]:
+    return list(_CODECS)
+
+
+class CacheSerializer:
+    """Encodes cache values with a codec, compressing bodies above a size threshold."""
+
+    def __init__(self, codec: str = "json", compress_min_bytes: int = 0):
+        # Unknown or uninstalled codecs fall back to stdlib JSON
+        self.codec = _CODECS.get(codec, _CODECS["json"])
+        self.compress_min_bytes = compress_min_bytes
+
+    def encode(self, value: Any) -> bytes:
+        body = self.codec.dumps(value)
+        flags = 0
+        if 0 < self.compress_min_bytes <= len(body):
+            body = zlib.compress(body, 1)
+            flags |= FLAG_ZLIB
+        return bytes((FORMAT_VERSION, self.codec.codec_id, flags)) + body
+
+    def decode(self, raw: bytes | str) -> Any:
+        if isinstance(raw, str):
+            return json.loads(raw)
+        if raw[0] != FORMAT_VERSION:
+            # Legacy plain-JSON entry
+            return json.loads(raw)
+        codec = _BY_ID.get(raw[1])
+        if codec is None:
+            raise ValueError(f"Unknown cache codec id {raw[1]}")
+        body = raw[_HEADER_LEN:]
+        if raw[2] & FLAG_ZLIB:
+            body = zlib.decompress(body)
+        return codec.loads(body)
@@ -7,6 +7,40 @@ class Settings(BaseModel):
     port: int = int(os.getenv("PORT", "8002"))
 
     db_url: str | None = os.getenv("DB_URL")
+    # Connection pool sizing is per process: keep
+    # replicas * (db_pool_size + db_max_overflow) under Postgres max_connections
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    db_pool_recycle_seconds: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    db_connect_timeout_seconds: float = float(
+        os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "5")
+    )
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    db_prepared_statement_cache_size: int = int(
+        os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100")
+    )
+    # Comma-separated read replica URLs used for GET cache misses
+    db_replica_urls: list[str] = [
+        u.strip() for u in os.getenv("DB_REPLICA_URLS", "").split(",") if u.strip()
+    ]
+    db_replica_selection: str = os.getenv("DB_REPLICA_SELECTION", "round_robin")
+    db_replica_eject_after_failures: int = int(
+        os.getenv("DB_REPLICA_EJECT_AFTER_FAILURES", "3")
+    )
+    db_replica_eject_seconds: float = float(os.getenv("DB_REPLICA_EJECT_SECONDS", "30"))
+    # Eject a replica while its moving-average point-read time exceeds this; 0 disables
+    db_replica_max_latency_ms: float = float(
+        os.getenv("DB_REPLICA_MAX_LATENCY_MS", "0")
+    )
+    # After a client writes, its reads go to the primary for this long
+    read_your_writes_seconds: int = int(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
     redis_url: str | None = os.getenv("REDIS_URL")
 
     enable_kafka: bool = os.getenv("ENABLE_KAFKA", "false").lower() in {
@@ -18,7 +52,46 @@ class Settings(BaseModel):
     topic_order_created: str = os.getenv(
         "TOPIC_ORDER_CREATED", "events.orders.order-created"
     )
+    # Events are written to an outbox table in the write's transaction and
+    # relayed to Kafka in batches; off, they are published after the commit
+    outbox_enabled: bool = os.getenv("OUTBOX_ENABLED", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    outbox_batch_size: int = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+    outbox_poll_interval_seconds: float = float(
+        os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "1")
+    )
+    # Non-outbox events go through a bounded in-process queue; on overflow
+    # `block` makes the request wait, `drop_newest`/`drop_oldest` shed events
+    events_queue_max_size: int = int(os.getenv("EVENTS_QUEUE_MAX_SIZE", "10000"))
+    events_queue_overflow: str = os.getenv("EVENTS_QUEUE_OVERFLOW", "block")
+    events_max_batch: int = int(os.getenv("EVENTS_MAX_BATCH", "500"))
+    events_flush_timeout_seconds: float = float(
+        os.getenv("EVENTS_FLUSH_TIMEOUT_SECONDS", "10")
+    )
+    # Producer batching: none | gzip | snappy | lz4 | zstd (the last three need
+    # their codec packages installed)
+    kafka_linger_ms: int = int(os.getenv("KAFKA_LINGER_MS", "5"))
+    kafka_max_batch_bytes: int = int(os.getenv("KAFKA_MAX_BATCH_BYTES", "65536"))
+    kafka_compression: str = os.getenv("KAFKA_COMPRESSION", "gzip")
     cache_ttl_seconds: int = int(os.getenv("CACHE_TTL_SECONDS", "30"))
+    # Cache-Control sent with GET /orders/{id} (and its 304s); empty omits it.
+    # Orders are per-customer, so shared caches must not keep them
+    order_cache_control: str = os.getenv("ORDER_CACHE_CONTROL", "private, no-cache")
+    # Redis value encoding: json | orjson | msgpack; bodies of at least
+    # CACHE_COMPRESS_MIN_BYTES are zlib-compressed (0 disables)
+    cache_codec: str = os.getenv("CACHE_CODEC", "json")
+    cache_compress_min_bytes: int = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "0"))
+    # Heavy-hitter tracking of cache_get keys (GET /debug/hot-keys); 0 disables
+    hot_keys_top_k: int = int(os.getenv("HOT_KEYS_TOP_K", "100"))
+    hot_keys_half_life_seconds: float = float(
+        os.getenv("HOT_KEYS_HALF_LIFE_SECONDS", "60")
+    )
+    # Short-lived "not found" markers so unknown ids skip the DB; 0 disables
+    negative_cache_ttl_seconds: int = int(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "5"))
     otlp_endpoint: str | None = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
     validate_avro: bool = os.getenv("VALIDATE_AVRO", "false").lower() in {
         "1",
@@ -26,6 +99,11 @@ class Settings(BaseModel):
         "yes",
         "on",
     }
+    # Event value encoding: json, or avro (schemaless Avro binary behind a
+    # single-object header carrying the schema fingerprint). Schemas are read
+    # from AVRO_SCHEMA_DIR, defaulting to the repo's contracts/avro
+    event_encoding: str = os.getenv("EVENT_ENCODING", "json")
+    avro_schema_dir: str | None = os.getenv("AVRO_SCHEMA_DIR")
 
 
 def get_settings() -> Settings:
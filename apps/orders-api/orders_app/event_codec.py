@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+from typing import Any
+
+try:
+    from fastavro import parse_schema, schemaless_reader, schemaless_writer
+    from fastavro.schema import fingerprint, to_parsing_canonical_form
+except Exception:  # pragma: no cover
+    parse_schema = None  # type: ignore
+
+# Wire format of an Avro event (Avro single-object encoding):
+#   bytes 0-1   marker C3 01
+#   bytes 2-9   CRC-64-AVRO fingerprint of the writer schema (the schema id)
+#   rest        schemaless Avro binary body
+# JSON events start with "{", so consumers can tell the two apart.
+MAGIC = b"\xc3\x01"
+HEADER_LEN = 10
+
+DEFAULT_SCHEMA_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "contracts", "avro")
+)
+
+
+class AvroEventCodec:
+    """One event schema, parsed once; encoding also validates the record."""
+
+    def __init__(self, schema: dict[str, Any]):
+        if parse_schema is None:
+            raise RuntimeError("fastavro is not installed")
+        self.schema = parse_schema(schema)
+        canonical = to_parsing_canonical_form(self.schema)
+        self.header = MAGIC + bytes.fromhex(fingerprint(canonical, "CRC-64-AVRO"))
+
+    def encode(self, record: dict[str, Any]) -> bytes:
+        buf = io.BytesIO()
+        buf.write(self.header)
+        schemaless_writer(buf, self.schema, record)
+        return buf.getvalue()
+
+    def decode(self, data: bytes) -> dict[str, Any]:
+        if data[:HEADER_LEN] != self.header:
+            raise ValueError("not an event of this schema")
+        return schemaless_reader(io.BytesIO(data[HEADER_LEN:]), self.schema)  # type: ignore[return-value]
+
+
+def load_codec(name: str, schema_dir: str | None = None) -> AvroEventCodec:
+    """Codec for contracts/avro/<name>.avsc (or `schema_dir`/<name>.avsc)."""
+    with open(os.path.join(schema_dir or DEFAULT_SCHEMA_DIR, f"{name}.avsc")) as f:
+        return AvroEventCodec(json.load(f))
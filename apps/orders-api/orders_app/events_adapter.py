@@ -1,56 +1,81 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-import os
-from typing import Any, Dict
+import json
+import sys
+from typing import Any, Dict, List, Optional
 
 from .config import get_settings
-from .events import publish_order_created_async
+from .event_codec import AvroEventCodec, load_codec
+from .events import publish_encoded_async
+from .outbox import OutboxRecord
 
 try:
-    from fastavro import parse_schema, validate
+    from fastavro import validate
 except Exception:  # pragma: no cover
-    parse_schema = None  # type: ignore
     validate = None  # type: ignore
 
-_parsed_schema = None
+_codec: Optional[AvroEventCodec] = None
+_encode_avro = False
+_validate_json = False
 
 
-async def emit_order_created(order: Dict[str, Any]) -> None:
-    payload = {
+def init_event_encoding(
+    encoding: str, *, validate_avro: bool = False, schema_dir: str | None = None
+) -> None:
+    """Parse the OrderCreated schema once; `avro` publishes its binary form.
+
+    Falls back to JSON (unvalidated) when the schema or fastavro is missing.
+    """
+    global _codec, _encode_avro, _validate_json
+    _codec, _encode_avro, _validate_json = None, False, False
+    if encoding != "avro" and not validate_avro:
+        return
+    try:
+        _codec = load_codec("OrderCreated", schema_dir)
+    except Exception as e:
+        print(
+            f"[orders-events] Avro schema unavailable ({e}); publishing JSON",
+            file=sys.stderr,
+        )
+        return
+    _encode_avro = encoding == "avro"
+    _validate_json = validate_avro and not _encode_avro and validate is not None
+
+
+def _build_payload(order: Dict[str, Any]) -> Dict[str, Any]:
+    # Already shaped like the OrderCreated contract
+    now = datetime.now(timezone.utc)
+    return {
         "event_id": order["id"],
-        "occurred_at": datetime.now(timezone.utc).isoformat(),
+        "occurred_at": now.isoformat(),
         "order_id": order["id"],
         "customer_id": order["customer_id"],
         "items": order["items"],
         "total_amount": float(order["total_amount"]),
         "currency": order.get("currency", "USD"),
         "status": order.get("status", "CREATED"),
-        "created_at": (
-            order.get("created_at") or datetime.now(timezone.utc)
-        ).isoformat(),
+        "created_at": (order.get("created_at") or now).isoformat(),
     }
 
-    settings = get_settings()
-    if settings.validate_avro and parse_schema and validate:
+
+def encode_order_created(order: Dict[str, Any]) -> bytes:
+    payload = _build_payload(order)
+    if _encode_avro:
+        return _codec.encode(payload)  # type: ignore[union-attr]
+    if _validate_json:
         try:
-            global _parsed_schema
-            if _parsed_schema is None:
-                schema_path = os.path.abspath(
-                    os.path.join(
-                        os.path.dirname(os.path.dirname(__file__)),
-                        "..",
-                        "contracts",
-                        "avro",
-                        "OrderCreated.avsc",
-                    )
-                )
-                import json
-
-                with open(schema_path) as f:
-                    _parsed_schema = parse_schema(json.load(f))
-            validate(payload, _parsed_schema)
+            validate(payload, _codec.schema)  # type: ignore[union-attr]
         except Exception:
             pass
+    return json.dumps(payload).encode("utf-8")
 
-    await publish_order_created_async(payload)
+
+def order_created_records(order: Dict[str, Any]) -> List[OutboxRecord]:
+    """The OrderCreated event encoded for the outbox, keyed by order id."""
+    topic = get_settings().topic_order_created
+    return [(topic, order["id"], encode_order_created(order))]
+
+
+async def emit_order_created(order: Dict[str, Any]) -> None:
+    await publish_encoded_async(order_created_records(order))
@@ -2,7 +2,15 @@ from __future__ import annotations
 
 import datetime as dt
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import String, Numeric, DateTime, ForeignKey, Integer
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    Numeric,
+    String,
+)
 
 
 class Base(DeclarativeBase):
@@ -36,3 +44,25 @@ class OrderItemORM(Base):
     unit_price: Mapped[float] = mapped_column(Numeric(12, 2))
 
     order: Mapped[OrderORM] = relationship(back_populates="items")
+
+
+class OutboxORM(Base):
+    """Events written in the same transaction as the row they describe.
+
+    The relay in outbox.py publishes them in id order and deletes them. The
+    table name is service-specific because the services may share a database.
+    """
+
+    __tablename__ = "orders_outbox"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True
+    )
+    topic: Mapped[str] = mapped_column(String(255), nullable=False)
+    key: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: dt.datetime.now(dt.timezone.utc),
+    )
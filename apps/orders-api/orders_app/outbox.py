@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import db
+from .models import OutboxORM
+
+try:
+    from prometheus_client import Counter, Gauge
+except Exception:  # pragma: no cover
+    Counter = None  # type: ignore
+    Gauge = None  # type: ignore
+
+# (topic, key, value) as written to the outbox and handed to the publisher
+OutboxRecord = tuple[str, Optional[str], bytes]
+Publish = Callable[[list[tuple[str, Optional[bytes], bytes]]], Awaitable[None]]
+
+# pg_try_advisory_xact_lock key: one relay drains at a time across replicas
+_LOCK_ID = 0x6F7264657273
+
+_lag_gauge = (
+    Gauge(
+        "orders_outbox_lag_seconds",
+        "Age of the oldest undelivered outbox event at the last relay pass",
+    )
+    if Gauge
+    else None
+)
+_relayed_counter = (
+    Counter("orders_outbox_relayed_total", "Outbox events published and deleted")
+    if Counter
+    else None
+)
+_failure_counter = (
+    Counter("orders_outbox_relay_failures_total", "Failed outbox relay passes")
+    if Counter
+    else None
+)
+
+_enabled = False
+_wakeup: Optional[asyncio.Event] = None
+_relay_task: Optional[asyncio.Task] = None
+
+
+def init_outbox(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled and db.is_ready()
+
+
+async def enqueue(session: AsyncSession, records: list[OutboxRecord]) -> None:
+    """Insert events in the caller's transaction; they commit with its rows.
+
+    Call after the row write: concurrent writes to one row are serialized by
+    its lock, so their outbox ids follow commit order and per-key order holds.
+    """
+    if not records:
+        return
+    now = dt.datetime.now(dt.timezone.utc)
+    await session.execute(
+        insert(OutboxORM),
+        [
+            {"topic": topic, "key": key, "payload": payload, "created_at": now}
+            for topic, key, payload in records
+        ],
+    )
+
+
+def notify() -> None:
+    """Wake the relay after a commit instead of waiting for the next poll."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def relay_once(publish: Publish, batch_size: int) -> int:
+    """Publish the oldest `batch_size` events in id order, then delete them.
+
+    Rows are deleted in the same transaction only after every send is acked,
+    so a failed publish leaves them for the next pass (at-least-once).
+    """
+    async with db.session_scope() as session:
+        if session.get_bind().dialect.name == "postgresql":
+            locked = await session.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": _LOCK_ID}
+            )
+            if not locked:
+                return 0
+        rows = (
+            await session.scalars(
+                select(OutboxORM).order_by(OutboxORM.id).limit(batch_size)
+            )
+        ).all()
+        if not rows:
+            if _lag_gauge:
+                _lag_gauge.set(0)
+            return 0
+        oldest = rows[0].created_at
+        if oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=dt.timezone.utc)
+        if _lag_gauge:
+            _lag_gauge.set(
+                max(0.0, (dt.datetime.now(dt.timezone.utc) - oldest).total_seconds())
+            )
+        await publish(
+            [(r.topic, r.key.encode() if r.key else None, r.payload) for r in rows]
+        )
+        await session.execute(
+            delete(OutboxORM).where(OutboxORM.id.in_([r.id for r in rows]))
+        )
+    if _relayed_counter:
+        _relayed_counter.inc(len(rows))
+    return len(rows)
+
+
+async def _relay_loop(
+    publish: Publish,
+    batch_size: int,
+    poll_interval_seconds: float,
+    wakeup: asyncio.Event,
+) -> None:
+    backoff = poll_interval_seconds
+    while True:
+        wakeup.clear()
+        try:
+            relayed = await relay_once(publish, batch_size)
+            backoff = poll_interval_seconds
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if _failure_counter:
+                _failure_counter.inc()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+            continue
+        if relayed >= batch_size:
+            continue  # likely more waiting
+        try:
+            await asyncio.wait_for(wakeup.wait(), poll_interval_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_relay(
+    publish: Publish, *, batch_size: int = 500, poll_interval_seconds: float = 1.0
+) -> None:
+    global _relay_task, _wakeup
+    if not is_enabled() or _relay_task is not None:
+        return
+    _wakeup = asyncio.Event()
+    _relay_task = asyncio.create_task(
+        _relay_loop(publish, batch_size, poll_interval_seconds, _wakeup)
+    )
+
+
+async def stop_relay() -> None:
+    """Undelivered events stay in the table for the next process to relay."""
+    global _relay_task, _wakeup
+    task, _relay_task = _relay_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    _wakeup = None
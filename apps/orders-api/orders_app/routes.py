@@ -1,22 +1,37 @@
 from __future__ import annotations
 
-import asyncio
+import time
 from contextlib import asynccontextmanager
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
-from . import db
-from .cache import cache_get, cache_set
+from . import db, outbox
+from .cache import (
+    cache_delete,
+    cache_get,
+    cache_get_version,
+    cache_get_versioned,
+    cache_set,
+)
+from .conditional import (
+    is_conditional,
+    not_modified,
+    not_modified_response,
+    validator_headers,
+    version_of,
+)
 from .repositories import (
     InMemoryOrderRepository,
     OrderRepository,
     SqlAlchemyOrderRepository,
 )
 from .schemas import Order, OrderCreate
-from .events_adapter import emit_order_created
+from .events_adapter import emit_order_created, order_created_records
 from .config import get_settings
+from .singleflight import SingleFlight
 
 
 router = APIRouter()
+_order_loads = SingleFlight("order")
 
 
 def get_repo() -> OrderRepository:
@@ -30,9 +45,49 @@ async def _null_session():
     yield None
 
 
+_PRIMARY_COOKIE = "rw_primary_until"
+
+
+def _pin_to_primary(response: Response) -> None:
+    """Send this client's reads to the primary for the read-your-writes window."""
+    window = get_settings().read_your_writes_seconds
+    if not db.has_replicas() or window <= 0:
+        return
+    response.set_cookie(
+        _PRIMARY_COOKIE, str(int(time.time()) + window), max_age=window, httponly=True
+    )
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _order_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "customer_id": row.customer_id,
+        "status": row.status,
+        "currency": row.currency,
+        "total_amount": float(row.total_amount),
+        "created_at": row.created_at,
+        "items": [
+            {
+                "product_id": it.product_id,
+                "quantity": it.quantity,
+                "unit_price": float(it.unit_price),
+            }
+            for it in row.items
+        ],
+    }
+
+
 @router.post("/orders", status_code=201, response_model=Order)
-async def create_order(body: OrderCreate) -> Order:
+async def create_order(body: OrderCreate, response: Response) -> Order:
     repo = get_repo()
+    use_outbox = outbox.is_enabled()
     sess_cm = db.session_scope() if db.is_ready() else _null_session()  # type: ignore
     async with sess_cm as session:  # type: ignore
         created = await repo.create(
@@ -41,65 +96,85 @@ async def create_order(body: OrderCreate) -> Order:
             currency=body.currency,
             items=[i.model_dump() for i in body.items],
         )
-    order_dict = {
-        "id": created.id,
-        "customer_id": created.customer_id,
-        "status": created.status,
-        "currency": created.currency,
-        "total_amount": float(created.total_amount),
-        "created_at": created.created_at,
-        "items": [
-            {
-                "product_id": it.product_id,
-                "quantity": it.quantity,
-                "unit_price": float(it.unit_price),
-            }
-            for it in created.items
-        ],
-    }
+        order_dict = _order_dict(created)
+        if use_outbox:
+            await outbox.enqueue(session, order_created_records(order_dict))
     settings = get_settings()
     await cache_set(
         f"order:{created.id}",
         order_dict | {"created_at": None},
         ttl_seconds=settings.cache_ttl_seconds,
         cache_name="order",
+        version=version_of(order_dict["created_at"]),
     )
-    asyncio.create_task(emit_order_created(order_dict))
+    await cache_delete(f"neg:order:{created.id}", cache_name="order_negative")
+    _pin_to_primary(response)
+    if use_outbox:
+        outbox.notify()
+    else:
+        await emit_order_created(order_dict)
     return Order(**order_dict)
 
 
 @router.get("/orders/{id}", response_model=Order)
-async def get_order(id: str) -> Order:
-    cached = await cache_get(f"order:{id}", cache_name="order")
+async def get_order(id: str, request: Request, response: Response) -> Order | Response:
+    cache_control = get_settings().order_cache_control
+    conditional = is_conditional(request)
+    if conditional:
+        # Revalidation only needs the cached version, not the order itself
+        version = await cache_get_version(f"order:{id}")
+        if version is not None and not_modified(request, version):
+            return not_modified_response(version, cache_control)
+    cached, version = await cache_get_versioned(f"order:{id}", cache_name="order")
     if cached:
+        response.headers.update(validator_headers(version, cache_control))
         return Order(**cached)
-    repo = get_repo()
-    sess_cm = db.session_scope() if db.is_ready() else _null_session()  # type: ignore
-    async with sess_cm as session:  # type: ignore
-        got = await repo.get(session, id)
-    if not got:
+    # Concurrent misses for the same id share one DB load and one cache_set.
+    # Clients inside their read-your-writes window only share primary loads.
+    use_primary = _pinned_to_primary(request)
+    order_dict = await _order_loads.do(
+        f"{id}:primary" if use_primary else id,
+        lambda: _load_order(id, use_primary=use_primary),
+    )
+    if order_dict is None:
         raise HTTPException(status_code=404, detail="Order not found")
-    order_dict = {
-        "id": got.id,
-        "customer_id": got.customer_id,
-        "status": got.status,
-        "currency": got.currency,
-        "total_amount": float(got.total_amount),
-        "created_at": got.created_at,
-        "items": [
-            {
-                "product_id": it.product_id,
-                "quantity": it.quantity,
-                "unit_price": float(it.unit_price),
-            }
-            for it in got.items
-        ],
-    }
+    version = version_of(order_dict["created_at"])
+    if conditional and version is not None and not_modified(request, version):
+        return not_modified_response(version, cache_control)
+    response.headers.update(validator_headers(version, cache_control))
+    return Order(**order_dict)
+
+
+async def _load_order(id: str, *, use_primary: bool = False) -> dict | None:
     settings = get_settings()
+    # Negative entries live under their own key so they never shadow an order
+    neg_key = f"neg:order:{id}"
+    if settings.negative_cache_ttl_seconds > 0 and await cache_get(
+        neg_key, cache_name="order_negative"
+    ):
+        return None
+    repo = get_repo()
+    if db.is_ready():
+        got = await db.run_read(
+            lambda session: repo.get(session, id), use_primary=use_primary
+        )
+    else:
+        got = await repo.get(None, id)  # type: ignore[arg-type]
+    if not got:
+        if settings.negative_cache_ttl_seconds > 0:
+            await cache_set(
+                neg_key,
+                {"missing": True},
+                ttl_seconds=settings.negative_cache_ttl_seconds,
+                cache_name="order_negative",
+            )
+        return None
+    order_dict = _order_dict(got)
     await cache_set(
         f"order:{id}",
         order_dict | {"created_at": None},
         ttl_seconds=settings.cache_ttl_seconds,
         cache_name="order",
+        version=version_of(order_dict["created_at"]),
     )
-    return Order(**order_dict)
+    return order_dict
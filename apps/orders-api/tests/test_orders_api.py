@@ -48,3 +48,150 @@ def test_create_and_get_order():
     got = r2.json()
     assert got["id"] == data["id"]
     assert got["total_amount"] == 20.0
+
+
+def test_get_unknown_order_returns_404():
+    r = client.get("/orders/o-does-not-exist")
+    assert r.status_code == 404
+    assert r.json()["error"]["code"] == 404
+
+
+def test_cache_codecs_round_trip_and_read_legacy_json():
+    from orders_app.codec import CacheSerializer, available_codecs
+
+    value = {"id": "o-1", "items": [{"product_id": "p-1", "quantity": 2}] * 50}
+    for name in available_codecs():
+        raw = CacheSerializer(name, compress_min_bytes=64).encode(value)
+        assert raw[2] == 1  # compressed
+        # Any serializer can read any codec's output
+        assert CacheSerializer("json").decode(raw) == value
+    assert CacheSerializer("msgpack").decode(b'{"id": "o-1"}') == {"id": "o-1"}
+
+
+def test_debug_hot_keys_lists_cache_reads():
+    from orders_app import cache
+
+    cache.init_hot_keys(10, 60)
+    try:
+        for _ in range(3):
+            client.get("/orders/o-hot-missing")
+        body = client.get("/debug/hot-keys", params={"limit": 2}).json()
+    finally:
+        cache.init_hot_keys(0, 0)
+    assert body["enabled"] is True
+    counts = {k["key"]: k["count"] for k in body["keys"]}
+    assert counts["order:o-hot-missing"] >= 3
+
+
+def test_outbox_commits_with_the_order_and_relays_in_order(tmp_path, monkeypatch):
+    import asyncio
+    import json
+
+    import pytest
+
+    pytest.importorskip("aiosqlite")
+
+    from fastapi import Response
+    from orders_app import db, events, outbox, routes
+    from orders_app.models import Base
+    from orders_app.schemas import OrderCreate
+
+    published = []
+
+    async def publish(records):
+        published.extend(records)
+
+    async def run():
+        db.init_engine(f"sqlite+aiosqlite:///{tmp_path / 'orders.db'}")
+        await db.create_all(Base.metadata)
+        outbox.init_outbox(True)
+        body = OrderCreate(
+            customer_id="c-1",
+            items=[{"product_id": "p-1", "quantity": 1, "unit_price": 2.5}],
+        )
+        ids = [(await routes.create_order(body, Response())).id for _ in range(3)]
+
+        # Kafka enabled but the producer is down: the pass fails, rows stay
+        async def no_producer():
+            return None
+
+        with monkeypatch.context() as m:
+            m.setattr(events, "kafka_enabled", lambda: True)
+            m.setattr(events, "_ensure_producer", no_producer)
+            with pytest.raises(RuntimeError):
+                await outbox.relay_once(events.publish_records_async, batch_size=2)
+
+        assert await outbox.relay_once(publish, batch_size=2) == 2
+        assert await outbox.relay_once(publish, batch_size=2) == 1
+        assert await outbox.relay_once(publish, batch_size=2) == 0
+        await db._engine.dispose()
+        return ids
+
+    monkeypatch.setattr(db, "_engine", None)
+    monkeypatch.setattr(db, "_session_maker", None)
+    monkeypatch.setattr(outbox, "_enabled", False)
+    ids = asyncio.run(run())
+    assert [key for _, key, _ in published] == [i.encode() for i in ids]
+    assert json.loads(published[0][2])["order_id"] == ids[0]
+
+
+def test_events_pipeline_applies_overflow_policy_and_flushes(monkeypatch):
+    import asyncio
+
+    from orders_app import events
+
+    sent = []
+
+    class FakeProducer:
+        async def send(self, topic, value, key=None):
+            fut = asyncio.get_running_loop().create_future()
+            fut.get_loop().call_soon(fut.set_result, None)
+            sent.append(key)
+            return fut
+
+        async def stop(self):
+            pass
+
+    async def fake_producer():
+        return FakeProducer()
+
+    monkeypatch.setattr(events, "_ensure_producer", fake_producer)
+
+    async def run(policy):
+        sent.clear()
+        await events.start_pipeline(queue_max_size=2, overflow=policy)
+        # No await point in between, so the sender cannot drain the queue yet
+        for i in range(5):
+            await events.publish_order_created_async({"order_id": f"o-{i}"})
+        assert await events.flush(1)
+        await events.stop_pipeline(1)
+        return list(sent)
+
+    assert asyncio.run(run("drop_newest")) == [b"o-0", b"o-1"]
+    assert asyncio.run(run("drop_oldest")) == [b"o-3", b"o-4"]
+
+
+def test_conditional_get_order(monkeypatch):
+    from orders_app import routes
+    from orders_app.config import Settings
+
+    settings = Settings(order_cache_control="private, max-age=60")
+    monkeypatch.setattr(routes, "get_settings", lambda: settings)
+    payload = {
+        "customer_id": "c-2",
+        "items": [{"product_id": "p-1", "quantity": 1, "unit_price": 5.0}],
+    }
+    oid = client.post("/orders", json=payload).json()["id"]
+    r = client.get(f"/orders/{oid}")
+    etag = r.headers["etag"]
+    assert r.headers["cache-control"] == "private, max-age=60"
+
+    assert (
+        client.get(f"/orders/{oid}", headers={"If-None-Match": etag}).status_code == 304
+    )
+    r304 = client.get(
+        f"/orders/{oid}", headers={"If-Modified-Since": r.headers["last-modified"]}
+    )
+    assert r304.status_code == 304 and r304.headers["etag"] == etag
+    r200 = client.get(f"/orders/{oid}", headers={"If-None-Match": '"0"'})
+    assert r200.status_code == 200 and r200.json()["id"] == oid
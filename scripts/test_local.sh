@@ -9,7 +9,7 @@ if [ ! -d "$TEST_VENV" ]; then
   python3 -m venv "$TEST_VENV" || python -m venv "$TEST_VENV"
 fi
 "$TEST_VENV"/bin/pip install --upgrade pip >/dev/null
-"$TEST_VENV"/bin/pip install pytest httpx >/dev/null
+"$TEST_VENV"/bin/pip install pytest httpx aiosqlite >/dev/null
 
 # Install app dependencies needed for tests (FastAPI, etc.)
 if [ -f apps/catalog-api/requirements.txt ]; then